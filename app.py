@@ -1,15 +1,33 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
+from contextlib import closing
 import os
-from PIL import Image
+from PIL import Image, ImageOps
 import json
+import copy
+import re
 import subprocess
 from datetime import datetime
 import time
 import base64
 import zipfile
+import sqlite3
 import io
+import hashlib
+import threading
+import functools
+import mimetypes
+import collections
+import concurrent.futures
+import urllib.request
+import html
+from image_pipeline import (
+    create_derivative, get_supported_formats, IMAGE_FORMATS, ingest_images, normalize_image, save_jpeg, get_tmp_path,
+    create_placeholder, store_blob, compute_dhash, compute_file_dhash, hamming_distance,
+    optimize_library, restore_originals, OPTIMIZE_TARGET_SSIM, OPTIMIZE_BACKUP_DIR, is_product_image,
+    get_derivative_path, lower_process_priority, get_process_context
+)
 
 # 페이지 설정
 st.set_page_config(
@@ -23,15 +41,88 @@ st.set_page_config(
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
+# 설정 파일
+SETTINGS_FILE = DATA_DIR / "settings.json"
+
+# 문의사항 데이터베이스 (예전 JSON 파일은 최초 실행 시 옮김)
+INQUIRY_DB = DATA_DIR / "inquiries.db"
+LEGACY_INQUIRY_FILE = DATA_DIR / "inquiries.json"
+INQUIRY_STATUSES = ["신규", "처리중", "완료"]
+INQUIRIES_PER_PAGE = 20
+
+# 구글 시트 (상품 정보) - SHEET_SOURCE_URL 환경 변수로 다른 주소나 로컬 CSV 파일 지정 가능
+SHEET_ID = "1Cnd19QAMyNEgvEdfXTA1QtW0VMiTRMCBFGmrzKWezNQ"
+SHEET_GID = 531747363  # OUR 시트 탭 (아워 상품 정보)
+DEFAULT_SHEET_SOURCE = f"https://docs.google.com/spreadsheets/d/{SHEET_ID}/export?format=csv&gid={SHEET_GID}"
+SHEET_SNAPSHOT_FILE = DATA_DIR / "sheet_snapshot.pkl"
+# 시트 다운로드 제한 시간(초) - 응답이 멈춰도 새로고침이 영원히 진행 중으로 남지 않도록
+SHEET_FETCH_TIMEOUT = 20
+
+# 시트에서 상품 폴더 번호를 담는 열 이름 (없으면 행 순서대로 폴더와 연결)
+PRODUCT_ID_COLUMNS = ["폴더", "폴더번호", "폴더 번호", "folder", "folder_id", "id"]
+
 # 이미지 디렉토리
 IMAGE_DIR = Path("image")
 
+# 썸네일 캐시 디렉토리 (메인 그리드 카드용, 상세 페이지용 축소 이미지)
+THUMBNAIL_DIR = DATA_DIR / "thumbnails"
+THUMBNAIL_WIDTH = 480
+THUMBNAIL_QUALITY = 85
+
+# 상세 갤러리 너비별 이미지 (브라우저가 srcset/sizes로 화면에 맞는 크기 선택)
+# 좁은 화면에서는 3열이 세로로 쌓여 화면 너비 전체, 넓은 화면에서는 1/3 너비로 표시
+DETAIL_WIDTHS = (320, 640, 1280)
+DETAIL_QUALITY = 85
+DETAIL_SIZES = "(max-width: 640px) 100vw, 33vw"
+
+# 파생 이미지 형식 (지원하는 브라우저는 <picture>에서 AVIF/WebP를 받고 나머지는 JPEG)
+# WebP/AVIF는 같은 품질 값에서 JPEG보다 화질이 좋아서 낮게 설정
+IMAGE_FORMATS_AVAILABLE = get_supported_formats()
+FORMAT_QUALITY = {"webp": 80, "avif": 60}
+mimetypes.add_type("image/avif", ".avif")
+
+# 파생 이미지 백그라운드 생성 프로세스 수 (화면 요청용 CPU를 남겨둠)
+DERIVATIVE_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# 작업 프로세스가 죽을 때 진행 중이던 작업을 다시 시도하는 횟수 (계속 죽게 하는 이미지는 실패 처리)
+DERIVATIVE_MAX_CRASHES = 3
+
+# 정적 파일 서빙 디렉토리 (Streamlit이 app/static/ 경로로 제공)
+# assets/는 내용 해시를 파일명으로 쓰는 콘텐츠 주소 저장소 (같은 이미지는 한 번만 저장/캐시)
+STATIC_DIR = Path("static")
+STATIC_ASSET_DIR = STATIC_DIR / "assets"
+STATIC_URL_PREFIX = "app/static"
+STATIC_SERVING = st.get_option("server.enableStaticServing")
+
+# 배너 이미지 저장소 (내용 해시를 파일명으로 사용)
+BANNER_DIR = STATIC_DIR / "banners"
+BANNER_SIZE = (1920, 400)
+BANNER_QUALITY = 82
+BANNER_REF_PATTERN = re.compile(r'^[0-9a-f]{20}\.jpg$')
+
+# 상품 이미지 ZIP 캐시 디렉토리
+ZIP_CACHE_DIR = DATA_DIR / "zips"
+# 일괄 다운로드 ZIP은 정적 서빙 중이면 static/zips/에 만들어서 서버가 디스크에서 바로 스트리밍
+STATIC_ZIP_DIR = STATIC_DIR / "zips"
+BULK_ZIP_CHUNK_SIZE = 1024 * 1024
+BULK_ZIP_MAX_AGE = 60 * 60
+
+# 유사 이미지 검사 (지각 해시 차이가 이 값 이하면 유사 이미지로 판단)
+PHASH_INDEX_FILE = DATA_DIR / "phash_index.json"
+NEAR_DUPLICATE_DISTANCE = 6
+
+# 카탈로그 매니페스트 변경 확인 주기 (초)
+CATALOG_CHECK_INTERVAL = 5
+
+# 스토어 화면(홈/상세/문의) fragment 키 - 화면 이동 시 이 영역만 다시 실행
+STOREFRONT_FRAGMENT = "storefront"
+
 # 관리자 계정 정보
 ADMIN_USERNAME = "our"
 ADMIN_PASSWORD = "our123"
 
-# CSS 스타일링
-st.markdown("""
+# CSS 스타일링 (정적 사이트 내보내기에서도 같은 스타일 사용)
+PAGE_STYLE = """
 <style>
     /* 전체 페이지 스타일 */
     .main {
@@ -136,6 +227,57 @@ st.markdown("""
         box-shadow: 0 4px 12px rgba(0,0,0,0.15);
     }
     
+    /* 상품 카드 그리드 (한 페이지를 HTML 하나로 표시, 좁은 화면에서는 한 줄에 하나) */
+    .product-grid {
+        display: grid;
+        grid-template-columns: repeat(3, minmax(0, 1fr));
+        gap: 16px;
+        margin-bottom: 16px;
+    }
+    
+    a.product-card {
+        display: block;
+        text-decoration: none !important;
+        color: inherit !important;
+    }
+    
+    @media (max-width: 640px) {
+        .product-grid {
+            grid-template-columns: minmax(0, 1fr);
+        }
+    }
+    
+    .product-image {
+        width: 100%;
+        height: auto;
+        display: block;
+        border-radius: 8px;
+    }
+    
+    .product-picture {
+        display: block;
+    }
+    
+    /* 썸네일이 로드되기 전에 흐린 미리보기로 최종 크기만큼 자리를 채움 */
+    .image-frame {
+        background-size: cover;
+        background-position: center;
+        border-radius: 8px;
+        overflow: hidden;
+    }
+    
+    .image-frame .product-image {
+        height: 100%;
+        object-fit: cover;
+    }
+    
+    .image-caption {
+        font-size: 14px;
+        color: #808495;
+        text-align: center;
+        margin: 4px 0 8px 0;
+    }
+    
     .product-name {
         font-size: 16px;
         font-weight: 600;
@@ -225,28 +367,31 @@ st.markdown("""
         box-shadow: 0 2px 8px rgba(0,0,0,0.1);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(PAGE_STYLE, unsafe_allow_html=True)
 
 # 세션 스테이트 초기화
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
 if 'page' not in st.session_state:
     st.session_state.page = 'home'
-if 'selected_product' not in st.session_state:
-    st.session_state.selected_product = None
+if 'selected_products' not in st.session_state:
+    st.session_state.selected_products = set()
 
-# 설정 파일 로드/저장 함수
-def load_settings():
-    settings_file = DATA_DIR / "settings.json"
-    if settings_file.exists():
-        with open(settings_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+# 다른 관리자 세션이 먼저 설정을 저장한 경우
+class SettingsConflictError(Exception):
+    pass
+
+# 기본 설정
+def get_default_settings():
     return {
         "banner_slide_interval": 3,
         "banners": [],
         "shop_name": "🌺 OUR SHOP 🌺",
         "shop_name_font_size": 48,
         "shop_name_color": "#333333",
+        "products_per_page": 12,
+        "sheet_refresh_interval": 300,
         "notice": {
             "title": "공지사항",
             "content": "신상품이 입고되었습니다!",
@@ -272,61 +417,539 @@ def load_settings():
         ]
     }
 
+# 프로세스 전체에서 공유하는 설정 캐시
+@st.cache_resource
+def get_settings_state():
+    return {"lock": threading.Lock(), "signature": None, "settings": None}
+
+# 설정 파일 시그니처 (수정 시각, 크기, inode)
+def get_settings_signature():
+    stat = SETTINGS_FILE.stat()
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+# 설정 파일 로드/저장 함수
+def load_settings():
+    if not SETTINGS_FILE.exists():
+        return get_default_settings()
+    
+    # 파일이 바뀌었을 때만 다시 읽음
+    state = get_settings_state()
+    with state["lock"]:
+        signature = get_settings_signature()
+        if state["signature"] != signature:
+            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                state["settings"] = json.load(f)
+            state["signature"] = signature
+        settings = copy.deepcopy(state["settings"])
+    
+    # 예전 방식(base64)으로 저장된 배너는 파일로 옮김
+    if migrate_legacy_banners(settings):
+        save_settings(settings)
+    return settings
+
+# 설정 저장 (임시 파일에 쓴 뒤 원자적으로 교체, 버전이 다르면 저장하지 않음)
 def save_settings(settings):
-    settings_file = DATA_DIR / "settings.json"
-    with open(settings_file, 'w', encoding='utf-8') as f:
-        json.dump(settings, f, ensure_ascii=False, indent=2)
-
-# 문의사항 로드/저장 함수
-def load_inquiries():
-    inquiry_file = DATA_DIR / "inquiries.json"
-    if inquiry_file.exists():
-        with open(inquiry_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {"inquiries": []}
+    state = get_settings_state()
+    with state["lock"]:
+        current_version = 0
+        if SETTINGS_FILE.exists():
+            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                current_version = json.load(f).get('version', 0)
+        
+        if settings.get('version', 0) != current_version:
+            raise SettingsConflictError(
+                f"설정이 다른 곳에서 먼저 변경되었습니다. (편집 버전 {settings.get('version', 0)}, 현재 버전 {current_version})"
+            )
+        
+        settings['version'] = current_version + 1
+        tmp_path = SETTINGS_FILE.with_name(f"{SETTINGS_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(settings, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, SETTINGS_FILE)
+        state["signature"] = None
+
+# 문의사항 데이터베이스 연결 (WAL 모드로 읽기와 쓰기가 서로 막지 않음)
+def get_inquiry_db():
+    init_inquiry_db()
+    conn = sqlite3.connect(INQUIRY_DB, timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+# 문의사항 테이블 생성 및 예전 JSON 데이터 이전 (프로세스당 한 번)
+@st.cache_resource
+def init_inquiry_db():
+    migrated = False
+    with closing(sqlite3.connect(INQUIRY_DB, timeout=10, isolation_level=None)) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            schema_version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if schema_version < 1:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS inquiries (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        timestamp TEXT NOT NULL,
+                        subject TEXT,
+                        data TEXT NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_inquiries_timestamp ON inquiries(timestamp)")
+                migrated = migrate_legacy_inquiries(conn)
+                conn.execute("PRAGMA user_version = 1")
+            if schema_version < 2:
+                # 처리 상태와 제목/내용 전문 검색 색인
+                conn.execute(f"ALTER TABLE inquiries ADD COLUMN status TEXT NOT NULL DEFAULT '{INQUIRY_STATUSES[0]}'")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_inquiries_status_timestamp ON inquiries(status, timestamp)")
+                create_inquiry_search_index(conn)
+                conn.execute("PRAGMA user_version = 2")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        
+        has_fts = conn.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name = 'inquiries_fts'"
+        ).fetchone()[0] > 0
+    
+    # 이번에 데이터베이스로 옮긴 JSON 파일만 이름을 바꿔서 보관
+    if migrated:
+        os.replace(LEGACY_INQUIRY_FILE, LEGACY_INQUIRY_FILE.with_name("inquiries.json.migrated"))
+    return {"fts": has_fts}
+
+# 제목/내용 전문 검색 색인 (FTS5 trigram, 한글 부분 검색 지원)
+def create_inquiry_search_index(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE inquiries_fts USING fts5(subject, message, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        # FTS5를 지원하지 않는 SQLite에서는 LIKE 검색으로 대체
+        return
+    conn.execute("""
+        INSERT INTO inquiries_fts (rowid, subject, message)
+        SELECT id, subject, json_extract(data, '$.message') FROM inquiries
+    """)
+    conn.execute("""
+        CREATE TRIGGER inquiries_fts_insert AFTER INSERT ON inquiries BEGIN
+            INSERT INTO inquiries_fts (rowid, subject, message)
+            VALUES (new.id, new.subject, json_extract(new.data, '$.message'));
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER inquiries_fts_delete AFTER DELETE ON inquiries BEGIN
+            DELETE FROM inquiries_fts WHERE rowid = old.id;
+        END
+    """)
+
+# 예전 inquiries.json 문의를 데이터베이스로 옮김 (기존 ID는 가능한 한 유지, 옮겼으면 True)
+def migrate_legacy_inquiries(conn):
+    if not LEGACY_INQUIRY_FILE.exists():
+        return False
+    with open(LEGACY_INQUIRY_FILE, 'r', encoding='utf-8') as f:
+        legacy_inquiries = json.load(f).get('inquiries', [])
+    
+    used_ids = set()
+    for inquiry in legacy_inquiries:
+        record = dict(inquiry)
+        legacy_id = record.pop('id', None)
+        timestamp = record.pop('timestamp', '')
+        # 동시 접수로 중복된 ID는 새 번호를 부여
+        row_id = legacy_id if isinstance(legacy_id, int) and legacy_id not in used_ids else None
+        cursor = conn.execute(
+            "INSERT INTO inquiries (id, timestamp, subject, data) VALUES (?, ?, ?, ?)",
+            (row_id, timestamp, record.get('subject', ''), json.dumps(record, ensure_ascii=False))
+        )
+        used_ids.add(cursor.lastrowid)
+    return True
+
+# 데이터베이스 행을 문의 딕셔너리로 변환
+def inquiry_from_row(row):
+    inquiry = json.loads(row['data'])
+    inquiry['timestamp'] = row['timestamp']
+    inquiry['id'] = row['id']
+    inquiry['status'] = row['status']
+    return inquiry
+
+# 문의 검색 (상태, 기간, 제목/내용 검색어) - (전체 건수, 현재 페이지 문의 목록) 반환
+def search_inquiries(query="", statuses=None, date_from=None, date_to=None, page=1, page_size=INQUIRIES_PER_PAGE):
+    conditions = []
+    params = []
+    
+    if statuses is not None:
+        # 상태를 하나도 고르지 않으면 결과 없음
+        if not statuses:
+            return 0, []
+        conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+        params.extend(statuses)
+    if date_from:
+        conditions.append("timestamp >= ?")
+        params.append(date_from.strftime("%Y-%m-%d 00:00:00"))
+    if date_to:
+        conditions.append("timestamp <= ?")
+        params.append(date_to.strftime("%Y-%m-%d 23:59:59"))
+    
+    query = query.strip()
+    if query:
+        # trigram 색인은 3글자 이상부터 사용 가능
+        if init_inquiry_db()["fts"] and len(query) >= 3:
+            conditions.append("id IN (SELECT rowid FROM inquiries_fts WHERE inquiries_fts MATCH ?)")
+            params.append('"' + query.replace('"', '""') + '"')
+        else:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions.append("(subject LIKE ? ESCAPE '\\' OR json_extract(data, '$.message') LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+    
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    with closing(get_inquiry_db()) as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM inquiries {where_clause}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT id, timestamp, status, data FROM inquiries {where_clause} ORDER BY id DESC LIMIT ? OFFSET ?",
+            params + [page_size, (page - 1) * page_size]
+        ).fetchall()
+    return total, [inquiry_from_row(row) for row in rows]
 
+# 문의 처리 상태 변경
+def update_inquiry_status(inquiry_id, status):
+    with closing(get_inquiry_db()) as conn:
+        conn.execute("UPDATE inquiries SET status = ? WHERE id = ?", (status, inquiry_id))
+
+# 문의사항 저장
 def save_inquiry(inquiry_data):
-    inquiries = load_inquiries()
-    inquiry_data['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    inquiry_data['id'] = len(inquiries['inquiries']) + 1
-    inquiries['inquiries'].append(inquiry_data)
-    
-    inquiry_file = DATA_DIR / "inquiries.json"
-    with open(inquiry_file, 'w', encoding='utf-8') as f:
-        json.dump(inquiries, f, ensure_ascii=False, indent=2)
+    record = dict(inquiry_data)
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with closing(get_inquiry_db()) as conn:
+        cursor = conn.execute(
+            "INSERT INTO inquiries (timestamp, subject, data) VALUES (?, ?, ?)",
+            (timestamp, record.get('subject', ''), json.dumps(record, ensure_ascii=False))
+        )
+    inquiry_data['timestamp'] = timestamp
+    inquiry_data['id'] = cursor.lastrowid
+    return cursor.lastrowid
 
-# 구글 시트 데이터 로드
-@st.cache_data
-def load_google_sheet_data():
+# 구글 시트 데이터 원본 주소
+def get_sheet_source():
+    return os.environ.get("SHEET_SOURCE_URL", DEFAULT_SHEET_SOURCE)
+
+# 시트 CSV 읽기 (URL은 제한 시간을 두고 내려받음)
+def read_sheet_csv(source):
+    if "://" not in source:
+        return pd.read_csv(source)
+    with urllib.request.urlopen(source, timeout=SHEET_FETCH_TIMEOUT) as response:
+        return pd.read_csv(io.BytesIO(response.read()))
+
+# 프로세스 전체에서 공유하는 시트 데이터 상태
+@st.cache_resource
+def get_sheet_state():
+    return {
+        "lock": threading.Lock(),
+        "df": None,
+        "version": None,
+        "loaded_at": 0.0,
+        "checked_at": 0.0,
+        "refreshing": False,
+        "error": None
+    }
+
+# 시트 데이터 버전 (내용 해시)
+def get_dataframe_version(df):
+    hasher = hashlib.sha1()
+    hasher.update(json.dumps([str(c) for c in df.columns], ensure_ascii=False).encode('utf-8'))
+    hasher.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return hasher.hexdigest()[:12]
+
+# 시트를 다시 받아서 로컬 스냅샷과 메모리 데이터를 교체
+# (백그라운드 스레드에서는 get_sheet_state()를 부를 수 없으므로 state를 넘겨받음)
+def refresh_sheet_data(state=None):
+    if state is None:
+        state = get_sheet_state()
+    try:
+        df = read_sheet_csv(get_sheet_source())
+        
+        tmp_path = SHEET_SNAPSHOT_FILE.with_name(f"{SHEET_SNAPSHOT_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, SHEET_SNAPSHOT_FILE)
+        
+        with state["lock"]:
+            state["df"] = df
+            state["version"] = get_dataframe_version(df)
+            state["loaded_at"] = time.time()
+            state["checked_at"] = state["loaded_at"]
+            state["error"] = None
+        return df
+    except Exception as e:
+        with state["lock"]:
+            state["checked_at"] = time.time()
+            state["error"] = str(e)
+        raise
+
+# 백그라운드 새로고침 (실패하면 기존 데이터를 계속 사용)
+def refresh_sheet_data_in_background(state):
     try:
-        sheet_id = "1Cnd19QAMyNEgvEdfXTA1QtW0VMiTRMCBFGmrzKWezNQ"
-        gid = 531747363  # OUR 시트 탭 (아워 상품 정보)
-        url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-        df = pd.read_csv(url)
+        refresh_sheet_data(state)
+    except Exception:
+        pass
+    finally:
+        with state["lock"]:
+            state["refreshing"] = False
+
+# 시트를 불러오지 못했을 때 쓰는 임시 데이터
+def get_placeholder_sheet_data():
+    return pd.DataFrame({
+        'A': [f'상품 {i}' for i in range(126, 152)],
+        'B': [f'색상/사이즈 정보 {i}' for i in range(126, 152)],
+        'C': [f'{50000 + i*1000}원' for i in range(26)]
+    })
+
+# 구글 시트 데이터 로드 (저장된 스냅샷을 바로 반환하고 오래됐으면 백그라운드에서 갱신)
+def load_google_sheet_data():
+    state = get_sheet_state()
+    refresh_interval = load_settings().get('sheet_refresh_interval', 300)
+    
+    with state["lock"]:
+        if state["df"] is None and SHEET_SNAPSHOT_FILE.exists():
+            try:
+                state["df"] = pd.read_pickle(SHEET_SNAPSHOT_FILE)
+                state["version"] = get_dataframe_version(state["df"])
+                state["loaded_at"] = SHEET_SNAPSHOT_FILE.stat().st_mtime
+                state["checked_at"] = state["loaded_at"]
+            except Exception:
+                state["df"] = None
+        
+        df = state["df"]
+        error = state["error"]
+        retry_wait = refresh_interval - (time.time() - state["checked_at"])
+        start_refresh = (
+            df is not None
+            and not state["refreshing"]
+            and time.time() - state["checked_at"] >= refresh_interval
+        )
+        if start_refresh:
+            state["refreshing"] = True
+    
+    if start_refresh:
+        threading.Thread(target=refresh_sheet_data_in_background, args=(state,), daemon=True).start()
+    
+    if df is not None:
         return df
+    
+    # 스냅샷이 없는데 방금 실패했으면 새로고침 간격 동안은 다시 받지 않음
+    if error is not None and retry_wait > 0:
+        st.error(f"데이터 로드 중 오류 발생: {error}")
+        return get_placeholder_sheet_data()
+    
+    # 스냅샷이 없을 때(최초 실행)만 직접 불러옴
+    try:
+        return refresh_sheet_data(state)
     except Exception as e:
         st.error(f"데이터 로드 중 오류 발생: {e}")
-        return pd.DataFrame({
-            'A': [f'상품 {i}' for i in range(126, 152)],
-            'B': [f'색상/사이즈 정보 {i}' for i in range(126, 152)],
-            'C': [f'{50000 + i*1000}원' for i in range(26)]
-        })
+        return get_placeholder_sheet_data()
+
+# 시트 셀 값을 표시용 문자열로 변환 (빈 칸은 None)
+def sheet_cell_text(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    text = str(value).strip()
+    return text or None
+
+# 폴더 번호 셀 값 정규화 (133, 133.0, "133" 모두 "133")
+def normalize_product_id(value):
+    text = sheet_cell_text(value)
+    if text is None:
+        return None
+    try:
+        number = float(text)
+        if number.is_integer():
+            return str(int(number))
+    except ValueError:
+        pass
+    return text
+
+# 폴더 번호 -> (상품명, 색상/사이즈, 가격) 표 생성 (시트/카탈로그 버전별로 한 번만)
+@st.cache_resource(max_entries=4)
+def build_product_table(sheet_version, catalog_version, _df, _folder_ids):
+    columns = [str(c).strip().lower() for c in _df.columns]
+    id_column = next((idx for idx, name in enumerate(columns) if name in PRODUCT_ID_COLUMNS), None)
+    value_columns = [idx for idx in range(len(columns)) if idx != id_column][:3]
+    
+    table = {}
+    for row_idx, row in enumerate(_df.itertuples(index=False, name=None)):
+        if id_column is not None:
+            product_id = normalize_product_id(row[id_column])
+        elif row_idx < len(_folder_ids):
+            product_id = _folder_ids[row_idx]
+        else:
+            break
+        if product_id is None or product_id in table:
+            continue
+        table[product_id] = tuple(sheet_cell_text(row[idx]) for idx in value_columns)
+    return table
+
+# 현재 시트 데이터로 만든 상품 정보 표 - (상품 정보 표, 시트 버전, 카탈로그 버전)
+def get_product_data():
+    df = load_google_sheet_data()
+    state = get_sheet_state()
+    with state["lock"]:
+        sheet_version = state["version"] if state["df"] is df else None
+    if sheet_version is None:
+        sheet_version = get_dataframe_version(df)
+    
+    manifest = get_catalog_manifest()
+    product_table = build_product_table(sheet_version, manifest["version"], df, tuple(manifest["products"].keys()))
+    return product_table, sheet_version, manifest["version"]
 
-# 이미지 폴더 스캔
+# 현재 시트 데이터로 만든 상품 정보 표
+def get_product_table():
+    return get_product_data()[0]
+
+# 폴더 번호로 상품 정보 찾기 - (상품명, 색상/사이즈, 가격)
+def get_product_info(folder_num, product_table=None):
+    if product_table is None:
+        product_table = get_product_table()
+    values = list(product_table.get(folder_num, ()))
+    values += [None] * (3 - len(values))
+    return (
+        values[0] or f"상품 {folder_num}",
+        values[1] or "정보 없음",
+        values[2] or "가격 문의"
+    )
+
+# 자연 정렬 키 (image_2.jpg가 image_10.jpg보다 앞에 오도록)
+def natural_sort_key(path):
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', path.name)]
+
+# 카탈로그 변경 감지용 시그니처 (이미지 디렉토리와 상품 폴더들의 수정 시각)
+def get_catalog_signature():
+    if not IMAGE_DIR.exists():
+        return ()
+    signature = [("", IMAGE_DIR.stat().st_mtime_ns)]
+    with os.scandir(IMAGE_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                signature.append((entry.name, entry.stat().st_mtime_ns))
+    return tuple(sorted(signature))
+
+# 카탈로그 매니페스트 생성 (폴더, 정렬된 이미지 목록, 파일 크기, 해상도, 대표 이미지)
+def build_catalog_manifest():
+    products = {}
+    if IMAGE_DIR.exists():
+        folders = sorted([f for f in IMAGE_DIR.iterdir() if f.is_dir()], key=natural_sort_key)
+        for folder in folders:
+            images = []
+            image_paths = sorted([f for f in folder.glob("*.jpg") if is_product_image(f)], key=natural_sort_key)
+            for image_path in image_paths:
+                stat = image_path.stat()
+                try:
+                    # 헤더만 읽어서 해상도 확인
+                    with Image.open(image_path) as img:
+                        width, height = img.size
+                except Exception:
+                    width, height = None, None
+                images.append({
+                    "path": image_path,
+                    "name": image_path.name,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "width": width,
+                    "height": height,
+                    "digest": get_content_digest(image_path)
+                })
+            
+            # 썸네일은 두 번째 이미지 (없으면 첫 번째)
+            if len(images) >= 2:
+                cover_image = images[1]
+            elif images:
+                cover_image = images[0]
+            else:
+                cover_image = None
+            
+            products[folder.name] = {
+                "id": folder.name,
+                "path": folder,
+                "images": images,
+                "cover": cover_image["path"] if cover_image else None,
+                "cover_size": (cover_image["width"], cover_image["height"]) if cover_image else None,
+                "placeholder": get_placeholder(cover_image) if cover_image else None
+            }
+    
+    version_source = json.dumps(
+        [[pid, [[img["name"], img["size"], img["mtime_ns"]] for img in product["images"]]]
+         for pid, product in products.items()]
+    )
+    return {
+        "version": hashlib.sha1(version_source.encode('utf-8')).hexdigest()[:12],
+        "products": products,
+        "built_at": time.time()
+    }
+
+# 흐린 미리보기 이미지 캐시 (내용 해시가 같으면 카탈로그를 다시 만들어도 재사용)
+@st.cache_resource
+def get_placeholder_cache():
+    return {"lock": threading.Lock(), "placeholders": {}}
+
+# 대표 이미지의 흐린 미리보기 data URI (생성 실패 시 None)
+def get_placeholder(image):
+    cache = get_placeholder_cache()
+    with cache["lock"]:
+        placeholder = cache["placeholders"].get(image["digest"])
+    if placeholder:
+        return placeholder
+    try:
+        placeholder = create_placeholder(image["path"])
+    except Exception:
+        return None
+    with cache["lock"]:
+        cache["placeholders"][image["digest"]] = placeholder
+    return placeholder
+
+# 프로세스 전체에서 공유하는 카탈로그 상태
+@st.cache_resource
+def get_catalog_state():
+    return {"lock": threading.Lock(), "manifest": None, "signature": None, "checked_at": 0.0}
+
+# 카탈로그 매니페스트 가져오기 (폴더 수정 시각이 바뀌었을 때만 다시 생성)
+def get_catalog_manifest():
+    state = get_catalog_state()
+    with state["lock"]:
+        now = time.time()
+        if state["manifest"] is None or now - state["checked_at"] >= CATALOG_CHECK_INTERVAL:
+            signature = get_catalog_signature()
+            if state["manifest"] is None or signature != state["signature"]:
+                state["manifest"] = build_catalog_manifest()
+                state["signature"] = signature
+            state["checked_at"] = now
+        return state["manifest"]
+
+# 카탈로그 캐시 무효화 (관리자 업로드 후 호출)
+def invalidate_catalog():
+    state = get_catalog_state()
+    with state["lock"]:
+        state["manifest"] = None
+
+# 이미지 폴더 목록
 def get_product_folders():
-    image_path = Path("image")
-    if not image_path.exists():
-        return []
-    folders = sorted([f for f in image_path.iterdir() if f.is_dir()])
-    return folders
+    manifest = get_catalog_manifest()
+    return [product["path"] for product in manifest["products"].values()]
 
 # 폴더의 이미지 파일 가져오기
 def get_folder_images(folder_path):
-    images = sorted([f for f in folder_path.glob("*.jpg") if f.name != "ㅎ.jpg"])
-    return images
+    product = get_catalog_manifest()["products"].get(folder_path.name)
+    if product and product["path"] == folder_path:
+        return [img["path"] for img in product["images"]]
+    return sorted([f for f in folder_path.glob("*.jpg") if is_product_image(f)], key=natural_sort_key)
+
+# 상품 카드용 흐린 미리보기 - (data URI, (너비, 높이)) 또는 (None, None)
+def get_cover_placeholder(folder_path):
+    product = get_catalog_manifest()["products"].get(folder_path.name)
+    if product and product["path"] == folder_path and product["placeholder"] and all(product["cover_size"]):
+        return product["placeholder"], product["cover_size"]
+    return None, None
 
 # 썸네일 이미지 가져오기 (두 번째 이미지)
 def get_thumbnail(folder_path):
+    product = get_catalog_manifest()["products"].get(folder_path.name)
+    if product and product["path"] == folder_path:
+        return product["cover"]
     images = get_folder_images(folder_path)
     if len(images) >= 2:
         return images[1]
@@ -334,83 +957,818 @@ def get_thumbnail(folder_path):
         return images[0]
     return None
 
+# 형식별 품질 (JPEG는 지정한 품질 그대로)
+def get_format_quality(fmt, quality):
+    return FORMAT_QUALITY.get(fmt, quality)
+
+# 파생 이미지 생성 목록 - [(캐시 디렉토리, 너비, 품질, 형식), ...] (업로드 시 미리 생성)
+def get_derivative_specs():
+    return [
+        (THUMBNAIL_DIR, width, get_format_quality(fmt, quality), fmt)
+        for width, quality in [(THUMBNAIL_WIDTH, THUMBNAIL_QUALITY)] + [(width, DETAIL_QUALITY) for width in DETAIL_WIDTHS]
+        for fmt in IMAGE_FORMATS_AVAILABLE
+    ]
+
+# 지정한 너비의 형식별 파생 이미지 - {형식: 경로}
+# 없는 파생 이미지는 백그라운드 생성 대기열에 넣고, 축소 JPEG가 생길 때까지 원본 JPEG를 사용
+# wait=True면 바로 생성해서 모든 형식을 반환 (정적 내보내기)
+def get_image_variants(image_path, width, quality, wait=False):
+    variants = {}
+    missing = []
+    for fmt in IMAGE_FORMATS_AVAILABLE:
+        fmt_quality = get_format_quality(fmt, quality)
+        if wait:
+            variants[fmt] = create_derivative(image_path, THUMBNAIL_DIR, width, fmt_quality, fmt)
+            continue
+        cache_path = get_derivative_path(image_path, THUMBNAIL_DIR, width, fmt)
+        if cache_path.exists():
+            variants[fmt] = cache_path
+        else:
+            missing.append((image_path, THUMBNAIL_DIR, width, fmt_quality, fmt))
+    
+    if missing:
+        queue_derivatives(missing, urgent=True)
+        if "jpeg" not in variants:
+            variants["jpeg"] = image_path
+    return variants
+
+# 파생 이미지 백그라운드 생성 상태 (프로세스 전체에서 하나)
+# queue: 생성할 작업 (화면에서 요청한 것은 앞에, 라이브러리 전체 준비는 뒤에)
+@st.cache_resource
+def get_derivative_worker():
+    worker = {
+        "lock": threading.Lock(),
+        "wakeup": threading.Event(),
+        "queue": collections.deque(),
+        "queued": set(),
+        "failed": set(),
+        "crashes": collections.Counter()
+    }
+    threading.Thread(target=run_derivative_worker, args=(worker,), daemon=True).start()
+    return worker
+
+# 대기열의 파생 이미지를 우선순위 낮은 프로세스 풀에서 생성 (백그라운드 스레드)
+def run_derivative_worker(worker):
+    while True:
+        running = {}
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=DERIVATIVE_WORKERS, mp_context=get_process_context(), initializer=lower_process_priority
+        )
+        try:
+            while True:
+                with worker["lock"]:
+                    while worker["queue"] and len(running) < DERIVATIVE_WORKERS * 2:
+                        task = worker["queue"].popleft()
+                        try:
+                            running[executor.submit(create_derivative, *task)] = task
+                        except Exception:
+                            worker["queue"].appendleft(task)
+                            raise
+                if not running:
+                    worker["wakeup"].wait()
+                    worker["wakeup"].clear()
+                    continue
+                
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                broken = False
+                with worker["lock"]:
+                    for future in done:
+                        task = running.pop(future)
+                        try:
+                            future.result()
+                        except concurrent.futures.BrokenExecutor:
+                            # 이미지 문제가 아니라 풀이 죽은 것이므로 다시 시도
+                            running[future] = task
+                            broken = True
+                            continue
+                        except Exception:
+                            worker["failed"].add(task)
+                        worker["queued"].discard(task)
+                        worker["crashes"].pop(task, None)
+                if broken:
+                    raise concurrent.futures.BrokenExecutor("파생 이미지 작업 프로세스가 종료되었습니다")
+        except Exception:
+            # 작업 프로세스가 죽으면 진행 중이던 작업을 다시 넣고 풀을 새로 만듦
+            with worker["lock"]:
+                for task in running.values():
+                    worker["crashes"][task] += 1
+                    if worker["crashes"][task] >= DERIVATIVE_MAX_CRASHES:
+                        worker["queued"].discard(task)
+                        worker["failed"].add(task)
+                    else:
+                        worker["queue"].appendleft(task)
+            time.sleep(1)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+# 파생 이미지 생성 작업 추가 (urgent면 대기열 맨 앞, 이미 실패한 작업은 다시 넣지 않음)
+def queue_derivatives(tasks, urgent=False):
+    worker = get_derivative_worker()
+    with worker["lock"]:
+        for task in tasks:
+            if task in worker["failed"]:
+                continue
+            if task in worker["queued"]:
+                if not urgent:
+                    continue
+                try:
+                    worker["queue"].remove(task)
+                except ValueError:
+                    # 이미 생성 중
+                    continue
+            worker["queued"].add(task)
+            if urgent:
+                worker["queue"].appendleft(task)
+            else:
+                worker["queue"].append(task)
+    worker["wakeup"].set()
+
+# 이미지들의 파생 이미지가 모두 있는지 (없는 것은 백그라운드 생성 대기열 맨 앞에 추가)
+# sizes: [(너비, 품질), ...]
+def ensure_derivatives(image_paths, sizes):
+    missing = [
+        (image_path, THUMBNAIL_DIR, width, get_format_quality(fmt, quality), fmt)
+        for image_path in image_paths
+        for width, quality in sizes
+        for fmt in IMAGE_FORMATS_AVAILABLE
+        if not get_derivative_path(image_path, THUMBNAIL_DIR, width, fmt).exists()
+    ]
+    if missing:
+        queue_derivatives(missing, urgent=True)
+    return not missing
+
+# 카탈로그 전체에서 아직 없는 파생 이미지 생성 작업 (카드 썸네일은 대표 이미지만)
+def get_missing_derivative_tasks(products):
+    return [
+        (img["path"], Path(cache_dir), width, quality, fmt)
+        for product in products.values()
+        for img in product["images"]
+        for cache_dir, width, quality, fmt in get_derivative_specs()
+        if width != THUMBNAIL_WIDTH or img["path"] == product["cover"]
+        if not get_derivative_path(img["path"], Path(cache_dir), width, fmt).exists()
+    ]
+
+# 카탈로그가 바뀔 때마다 없는 파생 이미지를 백그라운드에서 미리 생성
+@st.cache_resource(max_entries=1)
+def warm_library_derivatives(catalog_version):
+    tasks = get_missing_derivative_tasks(get_catalog_manifest()["products"])
+    if tasks:
+        queue_derivatives(tasks)
+    return len(tasks)
+
+# 업로드 이미지 저장 (프로세스 풀에서 정규화/최적화하고 파생 이미지까지 생성, 진행 상황 표시)
+# items: [(업로드 파일, 저장 경로), ...] - 실패한 (저장 경로, 오류) 목록 반환
+def save_uploaded_images(items):
+    progress_bar = st.progress(0.0, text="이미지 처리 준비 중...")
+    
+    def on_progress(done, total, dest_path, error):
+        status = "실패" if error else "완료"
+        progress_bar.progress(done / total, text=f"이미지 처리 중... {done}/{total} ({dest_path.name} {status})")
+    
+    results, errors = ingest_images(
+        [(uploaded_file.getvalue(), dest_path) for uploaded_file, dest_path in items],
+        get_derivative_specs(),
+        on_progress
+    )
+    progress_bar.empty()
+    
+    # 이미 저장소에 있는 이미지와 같으면 저장소 파일을 공유
+    for result in results:
+        store_blob(result["path"], get_blob_path(result["path"]), dedupe=True)
+    
+    for dest_path, error in errors:
+        st.warning(f"⚠️ {dest_path.name} 저장 실패: {error}")
+    return errors
+
+# 파일 내용 해시 캐시 (경로 + 수정 시각 + 크기가 같으면 다시 계산하지 않음)
+@st.cache_resource
+def get_digest_cache():
+    return {"lock": threading.Lock(), "digests": {}}
+
+# 파일 내용 SHA-256 해시
+def get_content_digest(file_path):
+    stat = file_path.stat()
+    key = (file_path.as_posix(), stat.st_mtime_ns, stat.st_size)
+    cache = get_digest_cache()
+    with cache["lock"]:
+        digest = cache["digests"].get(key)
+    if digest:
+        return digest
+    
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    digest = hasher.hexdigest()
+    with cache["lock"]:
+        cache["digests"][key] = digest
+    return digest
+
+# 콘텐츠 주소 저장소 경로
+def get_blob_path(file_path, digest=None):
+    digest = digest or get_content_digest(file_path)
+    return STATIC_ASSET_DIR / f"{digest[:20]}{file_path.suffix.lower()}"
+
+# 정적 파일 URL (내용 해시로 파일명을 정해서 브라우저가 계속 캐시할 수 있도록 함)
+def get_static_url(file_path):
+    blob_path, _ = store_blob(file_path, get_blob_path(file_path))
+    return f"{STATIC_URL_PREFIX}/assets/{blob_path.name}"
+
+# 상품 이미지 중복 정리 (같은 내용의 파일을 저장소 파일 하나로 연결)
+# (중복 그룹 목록, 절약된 바이트) 반환
+def dedupe_image_library():
+    groups = {}
+    for product in get_catalog_manifest()["products"].values():
+        for img in product["images"]:
+            groups.setdefault(img["digest"], []).append(img)
+    
+    saved_bytes = 0
+    for digest, images in groups.items():
+        blob_path = get_blob_path(images[0]["path"], digest)
+        for img in images:
+            _, linked = store_blob(img["path"], blob_path, dedupe=True)
+            if linked:
+                saved_bytes += img["size"]
+    
+    invalidate_catalog()
+    duplicate_groups = [[img["path"] for img in images] for images in groups.values() if len(images) > 1]
+    return duplicate_groups, saved_bytes
+
+# 상품 이미지 지각 해시 목록 - [(해시, 경로), ...] (내용 해시별로 data/에 저장해서 재계산 방지)
+@st.cache_resource(max_entries=1)
+def build_phash_index(catalog_version):
+    stored = {}
+    if PHASH_INDEX_FILE.exists():
+        with open(PHASH_INDEX_FILE, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    
+    index = []
+    changed = False
+    for product in get_catalog_manifest()["products"].values():
+        for img in product["images"]:
+            phash = stored.get(img["digest"])
+            if phash is None:
+                try:
+                    phash = format(compute_file_dhash(img["path"]), '016x')
+                except Exception:
+                    continue
+                stored[img["digest"]] = phash
+                changed = True
+            index.append((int(phash, 16), img["path"]))
+    
+    if changed:
+        tmp_path = get_tmp_path(PHASH_INDEX_FILE)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f)
+        os.replace(tmp_path, PHASH_INDEX_FILE)
+    return index
+
+# 업로드 이미지와 비슷한 기존 상품 이미지 찾기 - [(업로드 파일명, 기존 이미지 경로, 해시 차이), ...]
+def find_near_duplicates(uploaded_files, exclude_folder=None):
+    index = build_phash_index(get_catalog_manifest()["version"])
+    if exclude_folder is not None:
+        index = [(phash, path) for phash, path in index if path.parent != exclude_folder]
+    matches = []
+    for uploaded_file in uploaded_files:
+        try:
+            with Image.open(io.BytesIO(uploaded_file.getvalue())) as img:
+                phash = compute_dhash(img)
+        except Exception:
+            continue
+        similar = sorted(
+            (hamming_distance(phash, existing_hash), path)
+            for existing_hash, path in index
+            if hamming_distance(phash, existing_hash) <= NEAR_DUPLICATE_DISTANCE
+        )
+        for distance, path in similar[:3]:
+            matches.append((uploaded_file.name, path, distance))
+    return matches
+
+# 유사 이미지 경고 표시 (경고를 표시했으면 True)
+def show_near_duplicate_warning(uploaded_files, exclude_folder=None):
+    matches = find_near_duplicates(uploaded_files, exclude_folder)
+    if not matches:
+        return False
+    lines = []
+    for upload_name, path, distance in matches:
+        similarity = "동일한 이미지" if distance == 0 else f"유사한 이미지 (차이 {distance})"
+        lines.append(f"- **{upload_name}** → `{path.parent.name}/{path.name}` {similarity}")
+    st.warning("⚠️ 이미 등록된 상품 이미지와 비슷한 이미지가 있습니다:\n\n" + "\n".join(lines))
+    return True
+
+# 원본 이미지 너비 (카탈로그 매니페스트에 있으면 파일을 다시 열지 않음)
+def get_image_width(image_path):
+    product = get_catalog_manifest()["products"].get(image_path.parent.name)
+    if product:
+        for img in product["images"]:
+            if img["path"] == image_path and img["width"]:
+                return img["width"]
+    with Image.open(image_path) as img:
+        return img.size[0]
+
+# srcset용 너비별 파생 이미지 - [(실제 너비, {형식: 경로}), ...]
+# 원본보다 큰 너비는 확대하지 않으므로 원본 너비 하나로 합침
+def get_srcset_variants(image_path, widths, quality, wait=False):
+    original_width = get_image_width(image_path)
+    variant_sets = []
+    for width in widths:
+        actual_width = min(width, original_width)
+        if variant_sets and variant_sets[-1][0] == actual_width:
+            continue
+        variant_sets.append((actual_width, get_image_variants(image_path, width, quality, wait)))
+    return variant_sets
+
+# <picture> 태그 생성 (AVIF/WebP 소스를 먼저 두고 JPEG를 기본 이미지로 사용)
+# variant_sets: [(너비, {형식: 경로}), ...] - 여러 개면 너비 서술자가 붙은 srcset과 sizes 사용
+# 아직 생성 중인 형식은 모든 너비가 준비될 때까지 <source>에서 뺌
+# placeholder/size가 있으면 최종 비율로 자리를 잡고 흐린 미리보기를 배경으로 깔아둠
+def get_picture_html(variant_sets, alt, sizes=None, placeholder=None, size=None):
+    def get_srcset(fmt):
+        if len(variant_sets) == 1:
+            return get_static_url(variant_sets[0][1][fmt])
+        return ", ".join(f"{get_static_url(variants[fmt])} {width}w" for width, variants in variant_sets)
+    
+    sizes_attr = f' sizes="{sizes}"' if sizes and len(variant_sets) > 1 else ""
+    sources = "".join(
+        f'<source type="{IMAGE_FORMATS[fmt][1]}" srcset="{get_srcset(fmt)}"{sizes_attr}>'
+        for fmt in variant_sets[0][1]
+        if fmt != "jpeg" and all(fmt in variants for _, variants in variant_sets)
+    )
+    img_srcset = f' srcset="{get_srcset("jpeg")}"{sizes_attr}' if sizes_attr else ""
+    size_attr = f' width="{size[0]}" height="{size[1]}"' if size else ""
+    picture_html = (
+        f'<picture class="product-picture">{sources}'
+        f'<img src="{get_static_url(variant_sets[-1][1]["jpeg"])}"{img_srcset}{size_attr} class="product-image" loading="lazy" alt="{html.escape(str(alt), quote=True)}">'
+        f'</picture>'
+    )
+    if placeholder and size:
+        picture_html = (
+            f'<div class="image-frame" style="aspect-ratio: {size[0]} / {size[1]}; '
+            f'background-image: url({placeholder});">{picture_html}</div>'
+        )
+    return picture_html
+
+# 이미지 표시 (정적 서빙 모드에서는 <picture> 태그로 형식별 정적 URL을 참조)
+def show_image(image_path, width, quality, caption=None, placeholder=None, size=None):
+    variants = get_image_variants(image_path, width, quality)
+    if STATIC_SERVING:
+        image_html = get_picture_html([(width, variants)], caption or image_path.name, placeholder=placeholder, size=size)
+        if caption:
+            image_html += f'<div class="image-caption">{caption}</div>'
+        st.markdown(image_html, unsafe_allow_html=True)
+    else:
+        st.image(str(variants["jpeg"]), use_container_width=True, caption=caption)
+
+# 상세 갤러리 이미지 HTML (너비별 srcset, 클릭하면 원본 크기로 보기)
+def get_gallery_image_html(image_path, caption=None, wait=False):
+    variant_sets = get_srcset_variants(image_path, DETAIL_WIDTHS, DETAIL_QUALITY, wait)
+    image_html = (
+        f'<a href="{get_static_url(image_path)}" target="_blank" title="원본 크기로 보기">'
+        f'{get_picture_html(variant_sets, caption or image_path.name, DETAIL_SIZES)}</a>'
+    )
+    if caption:
+        image_html += f'<div class="image-caption">{caption}</div>'
+    return image_html
+
+# 상세 갤러리 이미지 표시
+def show_gallery_image(image_path, caption=None):
+    if STATIC_SERVING:
+        st.markdown(get_gallery_image_html(image_path, caption), unsafe_allow_html=True)
+    else:
+        variant_sets = get_srcset_variants(image_path, DETAIL_WIDTHS, DETAIL_QUALITY)
+        st.image(str(variant_sets[-1][1]["jpeg"]), use_container_width=True, caption=caption)
+        with st.expander("🔍 원본 크기로 보기"):
+            st.image(str(image_path))
+
+# 폴더 이미지 구성 지문 (이미지 이름, 크기, 수정 시각 기반)
+def get_folder_fingerprint(folder_path):
+    product = get_catalog_manifest()["products"].get(folder_path.name)
+    if product and product["path"] == folder_path:
+        entries = [[img["name"], img["size"], img["mtime_ns"]] for img in product["images"]]
+    else:
+        entries = []
+        for image_path in get_folder_images(folder_path):
+            stat = image_path.stat()
+            entries.append([image_path.name, stat.st_size, stat.st_mtime_ns])
+    fingerprint_source = json.dumps([folder_path.name, entries])
+    return hashlib.sha1(fingerprint_source.encode('utf-8')).hexdigest()[:16]
+
+# 상품 이미지 ZIP 가져오기 (폴더 지문별로 디스크에 캐시, JPEG는 압축 없이 저장)
+def get_product_zip(folder_path):
+    folder_num = folder_path.name
+    zip_path = ZIP_CACHE_DIR / f"{folder_num}_{get_folder_fingerprint(folder_path)}.zip"
+    if zip_path.exists():
+        return zip_path
+    
+    ZIP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = zip_path.with_name(f"{zip_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_STORED) as zip_file:
+        for img_path in get_folder_images(folder_path):
+            zip_file.write(img_path, img_path.name)
+    os.replace(tmp_path, zip_path)
+    
+    # 이미지가 바뀌기 전의 ZIP 정리
+    for old_zip in ZIP_CACHE_DIR.glob(f"{folder_num}_*.zip"):
+        if old_zip != zip_path:
+            old_zip.unlink(missing_ok=True)
+    return zip_path
+
+# 다운로드 버튼 클릭 시 ZIP 내용 읽기
+def read_product_zip(folder_path):
+    return get_product_zip(folder_path).read_bytes()
+
+# ZIP 스트림 출력 버퍼 (zipfile이 쓴 바이트를 청크 단위로 꺼내감)
+class ZipChunkWriter:
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.offset
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        chunks = self.chunks
+        self.chunks = []
+        return chunks
+
+# 여러 상품을 상품별 하위 폴더로 묶은 ZIP을 청크 단위로 생성
+def iter_bulk_zip_chunks(folders, chunk_size=BULK_ZIP_CHUNK_SIZE):
+    writer = ZipChunkWriter()
+    with zipfile.ZipFile(writer, 'w', zipfile.ZIP_STORED) as zip_file:
+        for folder in folders:
+            for img_path in get_folder_images(folder):
+                zip_info = zipfile.ZipInfo.from_file(img_path, f"{folder.name}/{img_path.name}")
+                zip_info.compress_type = zipfile.ZIP_STORED
+                with open(img_path, 'rb') as src, zip_file.open(zip_info, 'w') as dst:
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        yield from writer.drain()
+                yield from writer.drain()
+    yield from writer.drain()
+
+# 선택한 상품들의 일괄 다운로드 ZIP 경로 (상품별 폴더 지문으로 이름 결정)
+def get_bulk_zip_path(folders, zip_dir=ZIP_CACHE_DIR):
+    fingerprint_source = json.dumps([[folder.name, get_folder_fingerprint(folder)] for folder in folders])
+    fingerprint = hashlib.sha1(fingerprint_source.encode('utf-8')).hexdigest()[:16]
+    return zip_dir / f"bulk_{fingerprint}.zip"
+
+# 선택한 상품들의 일괄 다운로드 ZIP 가져오기 (청크 단위로 디스크에 기록)
+def get_bulk_zip(folders, zip_dir=ZIP_CACHE_DIR):
+    zip_path = get_bulk_zip_path(folders, zip_dir)
+    if zip_path.exists():
+        return zip_path
+    
+    zip_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = zip_path.with_name(f"{zip_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        for chunk in iter_bulk_zip_chunks(folders):
+            f.write(chunk)
+    os.replace(tmp_path, zip_path)
+    
+    # 오래된 일괄 다운로드 ZIP 정리
+    now = time.time()
+    for old_zip in zip_dir.glob("bulk_*.zip"):
+        if old_zip != zip_path and now - old_zip.stat().st_mtime > BULK_ZIP_MAX_AGE:
+            old_zip.unlink(missing_ok=True)
+    return zip_path
+
+# 다운로드 버튼 클릭 시 일괄 다운로드 ZIP 내용 읽기 (정적 서빙을 쓰지 않을 때)
+def read_bulk_zip(folder_names):
+    folders = [IMAGE_DIR / name for name in folder_names]
+    return get_bulk_zip(folders).read_bytes()
+
+# 일괄 다운로드 ZIP 만들기 (버튼 콜백 - 정적 서빙용 static/zips/에 생성)
+def prepare_static_bulk_zip(folder_names):
+    get_bulk_zip([IMAGE_DIR / name for name in folder_names], STATIC_ZIP_DIR)
+
+# 상품 선택 체크박스 변경 처리
+def toggle_product_selection(folder_num):
+    if folder_num in st.session_state.selected_products:
+        st.session_state.selected_products.discard(folder_num)
+    else:
+        st.session_state.selected_products.add(folder_num)
+
+# 상품 선택 모두 해제 (체크박스 상태도 함께 초기화)
+def clear_product_selection():
+    for folder_num in st.session_state.selected_products:
+        st.session_state.pop(f"select_{folder_num}", None)
+    st.session_state.selected_products = set()
+
+# 메인 그리드 페이지 이동 (버튼 콜백 - 그리드 fragment만 다시 실행)
+def set_grid_page(page):
+    st.query_params["page"] = str(page)
+
+# 메인 그리드 현재 페이지 (URL의 page 파라미터)
+def get_current_grid_page(total_pages):
+    try:
+        page = int(st.query_params.get("page", 1))
+    except (TypeError, ValueError):
+        page = 1
+    return min(max(page, 1), total_pages)
+
+# 상품 카드 그리드 HTML - get_link(상품 번호)로 카드 링크 주소 결정
+def get_product_cards_html(folder_names, product_table, get_link, wait=False):
+    products = get_catalog_manifest()["products"]
+    cards = []
+    for folder_num in folder_names:
+        product = products.get(folder_num)
+        if product is None:
+            continue
+        product_name, product_info, product_price = get_product_info(folder_num, product_table)
+        
+        image_html = ""
+        if product["cover"]:
+            try:
+                variants = get_image_variants(product["cover"], THUMBNAIL_WIDTH, THUMBNAIL_QUALITY, wait)
+                image_html = get_picture_html(
+                    [(THUMBNAIL_WIDTH, variants)],
+                    product_name,
+                    placeholder=product["placeholder"],
+                    size=product["cover_size"] if product["cover_size"] and all(product["cover_size"]) else None
+                )
+            except Exception:
+                image_html = '<div class="product-info">이미지를 불러올 수 없습니다.</div>'
+        
+        cards.append(
+            f'<a class="product-card" href="{get_link(folder_num)}" target="_self">'
+            f'{image_html}'
+            f'<div class="product-name">{product_name}</div>'
+            f'<div class="product-info">{product_info}</div>'
+            f'<div class="product-price">{product_price}</div>'
+            f'</a>'
+        )
+    return f'<div class="product-grid">{"".join(cards)}</div>'
+
+# 앱의 상품 카드 그리드 HTML (카탈로그/시트 버전과 페이지의 상품 목록이 같으면 재사용)
+# 카드 전체가 ?product= 링크라서 상세보기 버튼 없이 한 번에 전송됨
+# ready: 썸네일이 모두 준비됐는지 (준비 전에는 원본 이미지로 만든 HTML을 따로 보관)
+@st.cache_resource(max_entries=32)
+def build_product_grid_html(sheet_version, catalog_version, folder_names, grid_page, ready, _product_table):
+    page_param = f"page={grid_page}&" if grid_page > 1 else ""
+    return get_product_cards_html(folder_names, _product_table, lambda folder_num: f"?{page_param}product={folder_num}")
+
+# 스토어 화면 이동 (버튼 콜백 - 스토어 fragment만 다시 실행해서 CSS 등 나머지 화면은 그대로 둠)
+# 상세 페이지는 URL의 product 파라미터, 문의 페이지는 view=inquiry로 열어서 주소를 공유하거나 새로고침해도 유지되도록 함
+def navigate_storefront(page, folder_num=None):
+    st.query_params.pop("product", None)
+    st.query_params.pop("view", None)
+    if page == 'detail':
+        st.session_state.page = 'home'
+        st.query_params["product"] = folder_num
+    else:
+        st.session_state.page = page
+        if page == 'inquiry':
+            st.query_params["view"] = "inquiry"
+    st.rerun(STOREFRONT_FRAGMENT)
+
+# 상품 상세 화면 데이터 (상품 번호 + 카탈로그/시트 버전별로 메모리에 보관해서 자주 보는 상품은 바로 표시)
+# 상품 정보, 정렬된 이미지 목록, 갤러리 HTML(파생 이미지 URL 포함), ZIP 다운로드 함수
+# ready: 갤러리 파생 이미지가 모두 준비됐는지 (준비 전에는 원본 이미지로 만든 HTML을 따로 보관)
+@st.cache_resource(max_entries=64)
+def build_product_page(product_id, catalog_version, sheet_version, ready, _product_table):
+    product = get_catalog_manifest()["products"].get(product_id)
+    if product is None:
+        return None
+    
+    product_name, product_info, product_price = get_product_info(product_id, _product_table)
+    images = []
+    for img in product["images"]:
+        image = {"path": img["path"], "name": img["name"], "html": None, "error": None}
+        if STATIC_SERVING:
+            try:
+                image["html"] = get_gallery_image_html(img["path"], img["name"])
+            except Exception as e:
+                image["error"] = str(e)
+        images.append(image)
+    
+    return {
+        "id": product_id,
+        "path": product["path"],
+        "name": product_name,
+        "info": product_info,
+        "price": product_price,
+        "images": images,
+        # ZIP 파일은 클릭했을 때만 캐시에서 읽음
+        "zip": functools.partial(read_product_zip, product["path"])
+    }
+
+# 현재 카탈로그/시트 버전의 상품 상세 화면 데이터 (없는 상품이면 None)
+def get_product_page(product_id):
+    product_table, sheet_version, catalog_version = get_product_data()
+    product = get_catalog_manifest()["products"].get(product_id)
+    ready = not STATIC_SERVING or product is None or ensure_derivatives(
+        [img["path"] for img in product["images"]],
+        [(width, DETAIL_QUALITY) for width in DETAIL_WIDTHS]
+    )
+    return build_product_page(product_id, catalog_version, sheet_version, ready, product_table)
+
 # 이미지를 base64로 인코딩
 def image_to_base64(image_path):
     with open(image_path, "rb") as img_file:
         return base64.b64encode(img_file.read()).decode()
 
-# 배너 슬라이더 표시
-def show_banner_slider(settings):
+# 배너 이미지 저장 (표시 크기로 줄이고 재압축한 뒤 내용 해시 파일명으로 저장)
+def save_banner_image(image_file):
+    BANNER_DIR.mkdir(parents=True, exist_ok=True)
+    with Image.open(image_file) as img:
+        img = normalize_image(img)
+        
+        # 배너 영역 비율(1920x400)에 맞게 자르기, 작은 이미지는 확대하지 않음
+        target_width = min(img.width, BANNER_SIZE[0])
+        target_height = round(target_width * BANNER_SIZE[1] / BANNER_SIZE[0])
+        img = ImageOps.fit(img, (target_width, target_height), Image.LANCZOS)
+        
+        # 파일명은 픽셀 내용 해시 (같은 배너는 같은 파일)
+        digest = hashlib.sha256(f"{img.size}".encode() + img.tobytes()).hexdigest()
+        banner_ref = f"{digest[:20]}.jpg"
+        banner_path = BANNER_DIR / banner_ref
+        if not banner_path.exists():
+            save_jpeg(img, banner_path, BANNER_QUALITY)
+    return banner_ref
+
+# base64로 settings.json에 들어 있던 배너를 파일로 옮김 (변경 여부 반환)
+def migrate_legacy_banners(settings):
     banners = settings.get('banners', [])
+    if all(BANNER_REF_PATTERN.match(banner) for banner in banners):
+        return False
+    
+    migrated = []
+    for banner in banners:
+        if BANNER_REF_PATTERN.match(banner):
+            migrated.append(banner)
+            continue
+        try:
+            migrated.append(save_banner_image(io.BytesIO(base64.b64decode(banner))))
+        except Exception:
+            # 손상된 배너는 건너뜀
+            pass
+    settings['banners'] = migrated
+    return True
+
+# 참조되지 않는 배너 파일 정리
+def cleanup_banner_files(banner_refs):
+    if not BANNER_DIR.exists():
+        return
+    for banner_path in BANNER_DIR.glob("*.jpg"):
+        if banner_path.name not in banner_refs:
+            banner_path.unlink(missing_ok=True)
+
+# 배너 이미지 주소 (정적 서빙 모드가 아니면 data URI)
+def get_banner_src(banner_ref):
+    if STATIC_SERVING:
+        return f"{STATIC_URL_PREFIX}/banners/{banner_ref}"
+    return f"data:image/jpeg;base64,{image_to_base64(BANNER_DIR / banner_ref)}"
+
+# 배너 슬라이더 표시 (슬라이드 전환은 브라우저에서 처리하므로 서버 재실행 없음)
+@st.fragment
+def show_banner_slider(settings):
+    banners = tuple(settings.get('banners', []))
+    banner_html = build_banner_html(
+        banners,
+        settings.get('banner_slide_interval', 3),
+        get_banner_files_state(banners)
+    )
+    st.html(banner_html, unsafe_allow_javascript=True)
+
+# 배너 파일 상태 - ((파일명, 수정 시각, 크기), ...), 없는 파일은 (파일명, None, None)
+def get_banner_files_state(banners):
+    files_state = []
+    for banner in banners:
+        try:
+            stat = (BANNER_DIR / banner).stat()
+            files_state.append((banner, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            files_state.append((banner, None, None))
+    return tuple(files_state)
+
+# 배너 슬라이더 HTML 캐시 (배너 목록, 전환 간격, 배너 파일이 바뀔 때만 다시 생성)
+@st.cache_resource(max_entries=4)
+def build_banner_html(banners, slide_interval, files_state):
+    return get_banner_html(banners, slide_interval)
+
+# 배너 슬라이더 HTML - get_src(배너 파일명)로 이미지 주소 결정
+# 첫 슬라이드만 바로 불러오고 나머지는 data-src로 두었다가 차례가 오기 전에 불러옴
+def get_banner_html(banners, slide_interval, get_src=get_banner_src):
+    banners = [banner for banner in banners if (BANNER_DIR / banner).exists()]
     
     if not banners:
         # 기본 배너
-        st.markdown("""
+        return """
         <div style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
                     height: 300px; display: flex; align-items: center; justify-content: center;
                     margin-bottom: 40px; border-radius: 12px;">
             <h1 style="color: white; font-size: 48px; font-weight: bold;">NEW ARRIVALS</h1>
         </div>
-        """, unsafe_allow_html=True)
-        return
+        """
     
-    slide_interval = settings.get('banner_slide_interval', 3) * 1000
+    slider_id = "banner-" + hashlib.sha1(f"{banners}{slide_interval}".encode()).hexdigest()[:12]
     
-    # 배너 이미지들 표시
-    banner_container = st.container()
-    with banner_container:
-        # JavaScript로 슬라이드 구현
-        banner_html = '<div class="banner-slider">'
-        
-        for idx, banner in enumerate(banners):
-            active_class = "active" if idx == 0 else ""
-            banner_html += f'<img src="data:image/jpeg;base64,{banner}" class="banner-slide {active_class}" id="slide{idx}">'
-        
-        # 슬라이드 인디케이터
-        banner_html += '<div class="slider-dots">'
-        for idx in range(len(banners)):
-            active_class = "active" if idx == 0 else ""
-            banner_html += f'<span class="dot {active_class}" id="dot{idx}"></span>'
-        banner_html += '</div></div>'
-        
-        # JavaScript 슬라이드 로직
-        banner_html += f"""
-        <script>
+    banner_html = f'<div class="banner-slider" id="{slider_id}">'
+    for idx, banner in enumerate(banners):
+        if idx == 0:
+            banner_html += f'<img src="{get_src(banner)}" class="banner-slide active" alt="" fetchpriority="high">'
+        else:
+            banner_html += f'<img data-src="{get_src(banner)}" class="banner-slide" alt="" decoding="async">'
+    
+    # 슬라이드 인디케이터
+    banner_html += '<div class="slider-dots">'
+    for idx in range(len(banners)):
+        active_class = "active" if idx == 0 else ""
+        banner_html += f'<span class="dot {active_class}"></span>'
+    banner_html += '</div></div>'
+    
+    if len(banners) < 2:
+        return banner_html
+    
+    # 슬라이드 전환 - 같은 슬라이더에 타이머가 두 번 걸리지 않도록 data-started로 표시
+    banner_html += f"""
+    <script>
+    (function() {{
+        const slider = document.getElementById("{slider_id}");
+        if (!slider || slider.dataset.started) return;
+        slider.dataset.started = "1";
+        const slides = slider.getElementsByClassName("banner-slide");
+        const dots = slider.getElementsByClassName("dot");
         let slideIndex = 0;
-        const slides = document.getElementsByClassName("banner-slide");
-        const dots = document.getElementsByClassName("dot");
         
-        function showSlides() {{
-            for (let i = 0; i < slides.length; i++) {{
-                slides[i].classList.remove("active");
-                dots[i].classList.remove("active");
+        function loadSlide(idx) {{
+            const slide = slides[idx];
+            if (slide.dataset.src) {{
+                slide.src = slide.dataset.src;
+                delete slide.dataset.src;
             }}
-            slideIndex++;
-            if (slideIndex > slides.length) {{slideIndex = 1}}
-            slides[slideIndex-1].classList.add("active");
-            dots[slideIndex-1].classList.add("active");
-            setTimeout(showSlides, {slide_interval});
         }}
         
-        showSlides();
-        </script>
-        """
+        function showNextSlide() {{
+            if (!slider.isConnected) {{
+                clearInterval(timer);
+                return;
+            }}
+            if (document.hidden) return;
+            slides[slideIndex].classList.remove("active");
+            dots[slideIndex].classList.remove("active");
+            slideIndex = (slideIndex + 1) % slides.length;
+            loadSlide(slideIndex);
+            slides[slideIndex].classList.add("active");
+            dots[slideIndex].classList.add("active");
+            // 다음 슬라이드는 한 간격 먼저 불러두기
+            loadSlide((slideIndex + 1) % slides.length);
+        }}
         
-        st.markdown(banner_html, unsafe_allow_html=True)
+        const timer = setInterval(showNextSlide, {int(slide_interval * 1000)});
+        if (slides[0].complete) {{
+            loadSlide(1);
+        }} else {{
+            slides[0].addEventListener("load", () => loadSlide(1), {{ once: true }});
+        }}
+    }})();
+    </script>
+    """
+    return banner_html
 
 # 공지사항 표시
+@st.fragment
 def show_notice(settings):
+    notice_html = get_notice_html(settings)
+    if notice_html:
+        st.markdown(notice_html, unsafe_allow_html=True)
+
+# 공지사항 HTML (공지가 꺼져 있으면 빈 문자열)
+def get_notice_html(settings):
     notice = settings.get('notice', {})
-    if notice.get('enabled', False):
-        st.markdown(f"""
+    if not notice.get('enabled', False):
+        return ""
+    return f"""
         <div class="notice-box">
             <div class="notice-title">📢 {notice.get('title', '공지사항')}</div>
             <div class="notice-content">{notice.get('content', '')}</div>
         </div>
-        """, unsafe_allow_html=True)
+        """
 
 # 푸터 표시
 def show_footer(settings):
+    footer_html = get_footer_html(settings)
+    if footer_html:
+        st.markdown(footer_html, unsafe_allow_html=True)
+    
+    # 문의하기 버튼
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col2:
+        st.button("📧 문의하기", use_container_width=True, on_click=navigate_storefront, args=('inquiry',))
+
+# 사업자 정보 푸터 HTML (사업자 정보가 꺼져 있으면 빈 문자열)
+def get_footer_html(settings):
     business_info = settings.get('business_info', {})
     
     if business_info.get('enabled', False):
@@ -441,58 +1799,21 @@ def show_footer(settings):
         
         footer_html += '</div></div></div>'
         
-        st.markdown(footer_html, unsafe_allow_html=True)
-    
-    # 문의하기 버튼
-    col1, col2, col3 = st.columns([1, 1, 1])
-    with col2:
-        if st.button("📧 문의하기", use_container_width=True):
-            st.session_state.page = 'inquiry'
-            st.rerun()
+        return footer_html
+    return ""
 
-# 메인 페이지
-def show_main_page():
-    settings = load_settings()
-    
-    # 헤더 (상점명)
-    shop_name = settings.get('shop_name', '🌺 OUR SHOP 🌺')
-    shop_name_font_size = settings.get('shop_name_font_size', 48)
-    shop_name_color = settings.get('shop_name_color', '#333333')
-    
-    st.markdown(f'''
-    <div class="header" style="font-size: {shop_name_font_size}px !important; color: {shop_name_color} !important;">
-        {shop_name}
-    </div>
-    ''', unsafe_allow_html=True)
-    
-    # 배너 슬라이더
-    show_banner_slider(settings)
-    
-    # 공지사항
-    show_notice(settings)
-    
-    # 데이터 로드
-    df = load_google_sheet_data()
-    folders = get_product_folders()
-    
-    if not folders:
-        st.warning("상품 폴더를 찾을 수 없습니다.")
-        return
-    
-    st.markdown("### 신상품")
-    st.markdown("---")
-    
-    # 3열 그리드로 상품 표시
+# 위젯으로 상품 카드 표시 (선택 모드의 체크박스, 정적 서빙을 끈 경우)
+def show_product_grid_widgets(page_folders, product_table, selection_mode):
     cols_per_row = 3
-    for i in range(0, len(folders), cols_per_row):
+    for i in range(0, len(page_folders), cols_per_row):
         cols = st.columns(cols_per_row)
         
         for j, col in enumerate(cols):
             idx = i + j
-            if idx >= len(folders):
+            if idx >= len(page_folders):
                 break
             
-            folder = folders[idx]
+            folder = page_folders[idx]
             folder_num = folder.name
             
             with col:
@@ -500,33 +1821,173 @@ def show_main_page():
                 thumbnail = get_thumbnail(folder)
                 if thumbnail:
                     try:
-                        img = Image.open(thumbnail)
-                        st.image(img, use_container_width=True)
+                        placeholder, size = get_cover_placeholder(folder)
+                        show_image(thumbnail, THUMBNAIL_WIDTH, THUMBNAIL_QUALITY, placeholder=placeholder, size=size)
                     except:
                         st.info("이미지를 불러올 수 없습니다.")
                 
                 # 상품 정보
-                row_idx = idx
-                if row_idx < len(df):
-                    product_name = df.iloc[row_idx, 0] if len(df.columns) > 0 else f"상품 {folder_num}"
-                    product_info = df.iloc[row_idx, 1] if len(df.columns) > 1 else "정보 없음"
-                    product_price = df.iloc[row_idx, 2] if len(df.columns) > 2 else "가격 문의"
-                else:
-                    product_name = f"상품 {folder_num}"
-                    product_info = "정보 없음"
-                    product_price = "가격 문의"
+                product_name, product_info, product_price = get_product_info(folder_num, product_table)
                 
                 st.markdown(f'<div class="product-name">{product_name}</div>', unsafe_allow_html=True)
                 st.markdown(f'<div class="product-info">{product_info}</div>', unsafe_allow_html=True)
                 st.markdown(f'<div class="product-price">{product_price}</div>', unsafe_allow_html=True)
                 
-                if st.button("상세보기", key=f"btn_{folder_num}"):
-                    st.session_state.selected_product = folder
-                    st.session_state.page = 'detail'
-                    st.rerun()
-    
-    # 푸터
-    show_footer(settings)
+                if selection_mode:
+                    st.checkbox(
+                        "선택",
+                        value=folder_num in st.session_state.selected_products,
+                        key=f"select_{folder_num}",
+                        on_change=toggle_product_selection,
+                        args=(folder_num,)
+                    )
+                
+                st.button(
+                    "상세보기",
+                    key=f"btn_{folder_num}",
+                    on_click=navigate_storefront,
+                    args=('detail', folder_num)
+                )
+
+# 상품 그리드 (선택 모드, 체크박스, 페이지 이동은 이 fragment만 다시 실행)
+@st.fragment
+def show_product_grid():
+    # 데이터 로드
+    product_table, sheet_version, catalog_version = get_product_data()
+    folders = get_product_folders()
+    
+    if not folders:
+        st.warning("상품 폴더를 찾을 수 없습니다.")
+        return
+    
+    st.markdown("### 신상품")
+    
+    # 여러 상품 선택 모드 (일괄 다운로드)
+    selection_mode = st.toggle("📦 여러 상품 선택해서 한 번에 다운로드", key="selection_mode")
+    if selection_mode:
+        folder_names = {f.name for f in folders}
+        selected_names = sorted(
+            (name for name in st.session_state.selected_products if name in folder_names),
+            key=lambda name: natural_sort_key(Path(name))
+        )
+        if selected_names:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                if STATIC_SERVING:
+                    # 만들어 둔 ZIP은 링크로 내려받아 앱 메모리에 올리지 않음
+                    zip_path = get_bulk_zip_path([IMAGE_DIR / name for name in selected_names], STATIC_ZIP_DIR)
+                    if zip_path.exists():
+                        st.link_button(
+                            f"📦 선택한 {len(selected_names)}개 상품 이미지 다운로드 (ZIP)",
+                            f"{STATIC_URL_PREFIX}/zips/{zip_path.name}",
+                            use_container_width=True
+                        )
+                    else:
+                        st.button(
+                            f"📦 선택한 {len(selected_names)}개 상품 ZIP 만들기",
+                            on_click=prepare_static_bulk_zip,
+                            args=(tuple(selected_names),),
+                            use_container_width=True
+                        )
+                else:
+                    st.download_button(
+                        label=f"📦 선택한 {len(selected_names)}개 상품 이미지 다운로드 (ZIP)",
+                        data=functools.partial(read_bulk_zip, tuple(selected_names)),
+                        file_name=f"OUR_SHOP_{len(selected_names)}개_상품_images.zip",
+                        mime="application/zip",
+                        use_container_width=True
+                    )
+            with col2:
+                st.button("선택 해제", use_container_width=True, on_click=clear_product_selection)
+        else:
+            st.info("다운로드할 상품을 선택하세요.")
+    
+    st.markdown("---")
+    
+    # 현재 페이지에 해당하는 상품만 표시
+    settings = load_settings()
+    page_size = max(1, int(settings.get('products_per_page', 12)))
+    total_pages = (len(folders) + page_size - 1) // page_size
+    current_page = get_current_grid_page(total_pages)
+    page_start = (current_page - 1) * page_size
+    page_end = min(page_start + page_size, len(folders))
+    
+    # 상품 카드 그리드 (정적 서빙 중이고 선택 모드가 아니면 페이지 전체를 HTML 하나로 표시)
+    # 선택 모드에서는 체크박스가 필요하므로 카드마다 위젯으로 표시
+    if STATIC_SERVING and not selection_mode:
+        page_folder_names = tuple(folder.name for folder in folders[page_start:page_end])
+        products = get_catalog_manifest()["products"]
+        ready = ensure_derivatives(
+            [products[name]["cover"] for name in page_folder_names if name in products and products[name]["cover"]],
+            [(THUMBNAIL_WIDTH, THUMBNAIL_QUALITY)]
+        )
+        grid_html = build_product_grid_html(
+            sheet_version,
+            catalog_version,
+            page_folder_names,
+            current_page,
+            ready,
+            product_table
+        )
+        st.markdown(grid_html, unsafe_allow_html=True)
+    else:
+        show_product_grid_widgets(folders[page_start:page_end], product_table, selection_mode)
+    
+    # 페이지 이동
+    if total_pages > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button(
+                "◀ 이전",
+                disabled=current_page <= 1,
+                use_container_width=True,
+                on_click=set_grid_page,
+                args=(current_page - 1,)
+            )
+        with col2:
+            st.markdown(
+                f'<div style="text-align: center; padding: 8px;">{current_page} / {total_pages} 페이지</div>',
+                unsafe_allow_html=True
+            )
+        with col3:
+            st.button(
+                "다음 ▶",
+                disabled=current_page >= total_pages,
+                use_container_width=True,
+                on_click=set_grid_page,
+                args=(current_page + 1,)
+            )
+
+# 상점명 헤더 HTML
+def get_header_html(settings):
+    shop_name = settings.get('shop_name', '🌺 OUR SHOP 🌺')
+    shop_name_font_size = settings.get('shop_name_font_size', 48)
+    shop_name_color = settings.get('shop_name_color', '#333333')
+    
+    return f'''
+    <div class="header" style="font-size: {shop_name_font_size}px !important; color: {shop_name_color} !important;">
+        {shop_name}
+    </div>
+    '''
+
+# 메인 페이지
+def show_main_page():
+    settings = load_settings()
+    
+    # 헤더 (상점명)
+    st.markdown(get_header_html(settings), unsafe_allow_html=True)
+    
+    # 배너 슬라이더
+    show_banner_slider(settings)
+    
+    # 공지사항
+    show_notice(settings)
+    
+    # 상품 그리드
+    show_product_grid()
+    
+    # 푸터
+    show_footer(settings)
     
     # 관리자 로그인 링크
     st.markdown("---")
@@ -536,65 +1997,71 @@ def show_main_page():
             st.session_state.page = 'login'
             st.rerun()
 
-# 상품 상세 페이지
-def show_detail_page():
-    if not st.session_state.selected_product:
-        st.session_state.page = 'home'
-        st.rerun()
-        return
-    
-    folder = st.session_state.selected_product
-    folder_num = folder.name
-    
+# 상세 이미지 갤러리 (이미지 다운로드는 이 fragment만 다시 실행)
+@st.fragment
+def show_detail_gallery(product_page):
+    images = product_page["images"]
+    cols_per_row = 3
+    for i in range(0, len(images), cols_per_row):
+        cols = st.columns(cols_per_row)
+        
+        for j, col in enumerate(cols):
+            idx = i + j
+            if idx >= len(images):
+                break
+            
+            image = images[idx]
+            with col:
+                try:
+                    if image["error"]:
+                        raise Exception(image["error"])
+                    if image["html"]:
+                        st.markdown(image["html"], unsafe_allow_html=True)
+                    else:
+                        show_gallery_image(image["path"], caption=image["name"])
+                    
+                    # 이미지 다운로드 버튼 (클릭했을 때만 파일을 읽어서 전송)
+                    st.download_button(
+                        label="📥 다운로드",
+                        data=image["path"].read_bytes,
+                        file_name=image["name"],
+                        mime="image/jpeg",
+                        key=f"download_{product_page['id']}_{idx}",
+                        use_container_width=True
+                    )
+                except Exception as e:
+                    st.error(f"이미지 로드 실패: {e}")
+
+# 상품 상세 페이지 (URL의 product 파라미터)
+def show_detail_page(product_id):
     # 뒤로가기 버튼
-    if st.button("← 목록으로 돌아가기"):
-        st.session_state.page = 'home'
-        st.session_state.selected_product = None
-        st.rerun()
+    st.button("← 목록으로 돌아가기", on_click=navigate_storefront, args=('home',))
     
     st.markdown("---")
     
-    # 상품 정보
-    df = load_google_sheet_data()
-    folders = get_product_folders()
-    folder_idx = folders.index(folder) if folder in folders else 0
-    
-    if folder_idx < len(df):
-        product_name = df.iloc[folder_idx, 0] if len(df.columns) > 0 else f"상품 {folder_num}"
-        product_info = df.iloc[folder_idx, 1] if len(df.columns) > 1 else "정보 없음"
-        product_price = df.iloc[folder_idx, 2] if len(df.columns) > 2 else "가격 문의"
-    else:
-        product_name = f"상품 {folder_num}"
-        product_info = "정보 없음"
-        product_price = "가격 문의"
+    product_page = get_product_page(product_id)
+    if product_page is None:
+        st.warning("상품을 찾을 수 없습니다. 목록에서 다시 선택해주세요.")
+        return
     
-    st.markdown(f"# {product_name}")
-    st.markdown(f'<div style="font-size: 16px; margin: 10px 0;"><strong>색상/사이즈:</strong> {product_info}</div>', unsafe_allow_html=True)
-    st.markdown(f'<div style="font-size: 16px; margin: 10px 0;"><strong>가격:</strong> {product_price}</div>', unsafe_allow_html=True)
+    # 상품 정보
+    st.markdown(f"# {product_page['name']}")
+    st.markdown(f'<div style="font-size: 16px; margin: 10px 0;"><strong>색상/사이즈:</strong> {product_page["info"]}</div>', unsafe_allow_html=True)
+    st.markdown(f'<div style="font-size: 16px; margin: 10px 0;"><strong>가격:</strong> {product_page["price"]}</div>', unsafe_allow_html=True)
     st.markdown("---")
     
     # 이미지 갤러리
-    images = get_folder_images(folder)
-    
-    if not images:
+    if not product_page["images"]:
         st.warning("상품 이미지가 없습니다.")
         return
     
     # 전체 이미지 다운로드 버튼
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        # ZIP 파일 생성
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for img_path in images:
-                zip_file.write(img_path, img_path.name)
-        
-        zip_buffer.seek(0)
-        
         st.download_button(
             label="📦 전체 이미지 다운로드 (ZIP)",
-            data=zip_buffer,
-            file_name=f"{product_name}_images.zip",
+            data=product_page["zip"],
+            file_name=f"{product_page['name']}_images.zip",
             mime="application/zip",
             use_container_width=True
         )
@@ -602,43 +2069,21 @@ def show_detail_page():
     st.markdown("---")
     
     # 3열 그리드로 모든 이미지 표시
-    cols_per_row = 3
-    for i in range(0, len(images), cols_per_row):
-        cols = st.columns(cols_per_row)
-        
-        for j, col in enumerate(cols):
-            idx = i + j
-            if idx >= len(images):
-                break
-            
-            with col:
-                try:
-                    img = Image.open(images[idx])
-                    st.image(img, use_container_width=True, caption=images[idx].name)
-                    
-                    # 이미지 다운로드 버튼
-                    with open(images[idx], 'rb') as file:
-                        st.download_button(
-                            label="📥 다운로드",
-                            data=file,
-                            file_name=images[idx].name,
-                            mime="image/jpeg",
-                            key=f"download_{folder_num}_{idx}",
-                            use_container_width=True
-                        )
-                except Exception as e:
-                    st.error(f"이미지 로드 실패: {e}")
+    show_detail_gallery(product_page)
 
 # 문의하기 페이지
 def show_inquiry_page():
     st.markdown('<div class="header">📧 문의하기</div>', unsafe_allow_html=True)
     
-    if st.button("← 메인으로 돌아가기"):
-        st.session_state.page = 'home'
-        st.rerun()
+    st.button("← 메인으로 돌아가기", on_click=navigate_storefront, args=('home',))
     
     st.markdown("---")
     
+    show_inquiry_form()
+
+# 문의 양식 (입력 오류 표시는 이 fragment만 다시 실행)
+@st.fragment
+def show_inquiry_form():
     settings = load_settings()
     form_fields = settings.get('inquiry_form_fields', [])
     
@@ -679,6 +2124,7 @@ def show_inquiry_page():
                 st.success("문의가 성공적으로 접수되었습니다! 빠른 시일 내에 답변드리겠습니다.")
                 time.sleep(2)
                 st.session_state.page = 'home'
+                st.query_params.pop("view", None)
                 st.rerun()
 
 # 로그인 페이지
@@ -716,597 +2162,844 @@ def show_login_page():
         
         st.markdown('</div>', unsafe_allow_html=True)
 
-# 관리자 페이지
-def show_admin_page():
-    if not st.session_state.logged_in:
-        st.session_state.page = 'login'
-        st.rerun()
-        return
+# 관리자 설정 저장 (이 세션이 편집을 시작한 버전 기준으로 충돌 확인)
+def save_admin_settings(settings):
+    try:
+        save_settings(settings)
+    except SettingsConflictError as e:
+        # 다음 실행에서 최신 설정을 다시 불러오도록 기준 버전 초기화
+        del st.session_state.settings_version
+        st.error(f"❌ {e} 최신 설정을 불러온 뒤 다시 저장해주세요.")
+        st.button("🔄 최신 설정 불러오기")
+        st.stop()
+    st.session_state.settings_version = settings['version']
+
+# 관리자 편집용 설정 (이 세션이 편집을 시작한 시점의 설정 버전을 붙여서 충돌 감지)
+def load_admin_settings():
+    settings = load_settings()
+    if 'settings_version' not in st.session_state:
+        st.session_state.settings_version = settings.get('version', 0)
+    settings['version'] = st.session_state.settings_version
+    return settings
+
+# 관리자 - 상점명 & 배너 관리 섹션
+@st.fragment
+def show_admin_banner_section():
+    settings = load_admin_settings()
     
-    st.markdown('<div class="header">⚙️ 관리자 페이지</div>', unsafe_allow_html=True)
+    st.subheader("상점명 및 배너 설정")
     
-    col1, col2 = st.columns([1, 1])
+    # 상점명 설정
+    st.markdown("### 🏪 상점명 설정")
+    
+    col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("← 메인 페이지로"):
-            st.session_state.page = 'home'
-            st.rerun()
+        shop_name = st.text_input(
+            "상점명",
+            value=settings.get('shop_name', '🌺 OUR SHOP 🌺'),
+            help="메인 페이지 상단에 표시될 상점명을 입력하세요"
+        )
+        
+        shop_name_font_size = st.slider(
+            "글자 크기",
+            min_value=20,
+            max_value=100,
+            value=settings.get('shop_name_font_size', 48),
+            help="상점명 글자 크기를 조절하세요"
+        )
     
     with col2:
-        if st.button("로그아웃"):
-            st.session_state.logged_in = False
-            st.session_state.page = 'home'
-            st.rerun()
+        shop_name_color = st.color_picker(
+            "글자 색상",
+            value=settings.get('shop_name_color', '#333333'),
+            help="상점명 글자 색상을 선택하세요"
+        )
+        
+        # 미리보기
+        st.markdown("**미리보기:**")
+        st.markdown(f'''
+        <div style="font-size: {shop_name_font_size}px; color: {shop_name_color}; text-align: center; font-weight: bold; padding: 20px;">
+            {shop_name}
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    if st.button("💾 상점명 설정 저장", use_container_width=True):
+        settings['shop_name'] = shop_name
+        settings['shop_name_font_size'] = shop_name_font_size
+        settings['shop_name_color'] = shop_name_color
+        save_admin_settings(settings)
+        st.success("✅ 상점명 설정이 저장되었습니다!")
+        st.rerun()
     
     st.markdown("---")
     
-    # 탭 메뉴
-    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-        "🏪 상점명 & 배너", 
-        "📢 공지사항", 
-        "📦 상품 관리", 
-        "🏢 사업자 정보",
-        "📧 문의 양식",
-        "💬 문의 내역",
-        "🔄 Git 업데이트"
-    ])
+    # 배너 슬라이드 설정
+    st.markdown("### 📸 배너 슬라이드 관리")
     
-    settings = load_settings()
+    # 슬라이드 시간 설정
+    slide_interval = st.number_input(
+        "슬라이드 전환 시간 (초)",
+        min_value=1,
+        max_value=10,
+        value=settings.get('banner_slide_interval', 3),
+        help="배너가 자동으로 전환되는 시간을 설정하세요"
+    )
     
-    # 배너 관리 탭
-    with tab1:
-        st.subheader("상점명 및 배너 설정")
-        
-        # 상점명 설정
-        st.markdown("### 🏪 상점명 설정")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            shop_name = st.text_input(
-                "상점명",
-                value=settings.get('shop_name', '🌺 OUR SHOP 🌺'),
-                help="메인 페이지 상단에 표시될 상점명을 입력하세요"
-            )
-            
-            shop_name_font_size = st.slider(
-                "글자 크기",
-                min_value=20,
-                max_value=100,
-                value=settings.get('shop_name_font_size', 48),
-                help="상점명 글자 크기를 조절하세요"
-            )
-        
-        with col2:
-            shop_name_color = st.color_picker(
-                "글자 색상",
-                value=settings.get('shop_name_color', '#333333'),
-                help="상점명 글자 색상을 선택하세요"
-            )
+    if slide_interval != settings.get('banner_slide_interval', 3):
+        settings['banner_slide_interval'] = slide_interval
+        save_admin_settings(settings)
+        st.success(f"슬라이드 시간이 {slide_interval}초로 설정되었습니다!")
+    
+    st.markdown("---")
+    
+    # 배너 이미지 업로드 (다중)
+    st.markdown("### 배너 이미지 업로드")
+    st.info("최대 5장까지 업로드 가능합니다. 업로드한 이미지는 배너 크기(1920x400px)에 맞게 자동으로 줄여서 저장됩니다.")
+    
+    uploaded_banners = st.file_uploader(
+        "배너 이미지 선택 (여러 장 가능)",
+        type=['jpg', 'jpeg', 'png'],
+        accept_multiple_files=True,
+        key="banner_upload"
+    )
+    
+    if uploaded_banners:
+        st.markdown("### 미리보기")
+        cols = st.columns(min(len(uploaded_banners), 3))
+        for idx, uploaded_file in enumerate(uploaded_banners[:5]):
+            with cols[idx % 3]:
+                st.image(uploaded_file, use_container_width=True)
+        
+        if st.button("배너 적용", use_container_width=True):
+            banner_list = []
+            for uploaded_file in uploaded_banners[:5]:
+                banner_list.append(save_banner_image(uploaded_file))
             
-            # 미리보기
-            st.markdown("**미리보기:**")
-            st.markdown(f'''
-            <div style="font-size: {shop_name_font_size}px; color: {shop_name_color}; text-align: center; font-weight: bold; padding: 20px;">
-                {shop_name}
-            </div>
-            ''', unsafe_allow_html=True)
-        
-        if st.button("💾 상점명 설정 저장", use_container_width=True):
-            settings['shop_name'] = shop_name
-            settings['shop_name_font_size'] = shop_name_font_size
-            settings['shop_name_color'] = shop_name_color
-            save_settings(settings)
-            st.success("✅ 상점명 설정이 저장되었습니다!")
+            settings['banners'] = banner_list
+            save_admin_settings(settings)
+            cleanup_banner_files(banner_list)
+            st.success(f"{len(banner_list)}장의 배너가 업데이트되었습니다!")
             st.rerun()
+    
+    # 현재 배너 표시
+    st.markdown("---")
+    st.markdown("### 현재 등록된 배너")
+    current_banners = settings.get('banners', [])
+    
+    if current_banners:
+        st.info(f"총 {len(current_banners)}장의 배너가 등록되어 있습니다.")
+        
+        cols = st.columns(min(len(current_banners), 3))
+        for idx, banner_ref in enumerate(current_banners):
+            with cols[idx % 3]:
+                banner_path = BANNER_DIR / banner_ref
+                if banner_path.exists():
+                    st.image(str(banner_path), use_container_width=True)
+                else:
+                    st.warning(f"배너 파일을 찾을 수 없습니다: {banner_ref}")
         
+        if st.button("모든 배너 제거", type="secondary"):
+            settings['banners'] = []
+            save_admin_settings(settings)
+            cleanup_banner_files([])
+            st.success("모든 배너가 제거되었습니다!")
+            st.rerun()
+    else:
+        st.warning("등록된 배너가 없습니다. 기본 배너가 표시됩니다.")
+
+# 관리자 - 공지사항 관리 섹션
+@st.fragment
+def show_admin_notice_section():
+    settings = load_admin_settings()
+    
+    st.subheader("공지사항 관리")
+    
+    notice = settings.get('notice', {})
+    
+    notice_enabled = st.checkbox(
+        "공지사항 표시",
+        value=notice.get('enabled', True)
+    )
+    
+    notice_title = st.text_input(
+        "공지사항 제목",
+        value=notice.get('title', '공지사항'),
+        placeholder="예: 신상품 입고"
+    )
+    
+    notice_content = st.text_area(
+        "공지사항 내용",
+        value=notice.get('content', ''),
+        height=150,
+        placeholder="공지사항 내용을 입력하세요..."
+    )
+    
+    if st.button("공지사항 저장", use_container_width=True):
+        settings['notice'] = {
+            'title': notice_title,
+            'content': notice_content,
+            'enabled': notice_enabled
+        }
+        save_admin_settings(settings)
+        st.success("공지사항이 저장되었습니다!")
+        st.rerun()
+    
+    # 미리보기
+    if notice_enabled:
         st.markdown("---")
+        st.markdown("### 미리보기")
+        st.markdown(f"""
+        <div class="notice-box">
+            <div class="notice-title">📢 {notice_title}</div>
+            <div class="notice-content">{notice_content}</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+# 관리자 - 상품 관리 섹션
+@st.fragment
+def show_admin_product_section():
+    settings = load_admin_settings()
+    
+    st.subheader("상품 정보 관리")
+    
+    # 상품 업로드 섹션
+    st.markdown("### 🆕 새 상품 등록")
+    
+    with st.form("upload_product_form"):
+        # 상품 정보 입력
+        product_name = st.text_input("상품명", placeholder="예: 반팔 티셔츠")
+        product_info = st.text_input("색상/사이즈", placeholder="예: 블랙/FREE")
+        product_price = st.text_input("가격", placeholder="예: 29,000원")
         
-        # 배너 슬라이드 설정
-        st.markdown("### 📸 배너 슬라이드 관리")
-        
-        # 슬라이드 시간 설정
-        slide_interval = st.number_input(
-            "슬라이드 전환 시간 (초)",
-            min_value=1,
-            max_value=10,
-            value=settings.get('banner_slide_interval', 3),
-            help="배너가 자동으로 전환되는 시간을 설정하세요"
-        )
-        
-        if slide_interval != settings.get('banner_slide_interval', 3):
-            settings['banner_slide_interval'] = slide_interval
-            save_settings(settings)
-            st.success(f"슬라이드 시간이 {slide_interval}초로 설정되었습니다!")
-        
-        st.markdown("---")
-        
-        # 배너 이미지 업로드 (다중)
-        st.markdown("### 배너 이미지 업로드")
-        st.info("최대 5장까지 업로드 가능합니다. 권장 크기: 1920x400px")
-        
-        uploaded_banners = st.file_uploader(
-            "배너 이미지 선택 (여러 장 가능)",
+        # 이미지 업로드
+        uploaded_files = st.file_uploader(
+            "상품 이미지 업로드 (여러 장 선택 가능)",
             type=['jpg', 'jpeg', 'png'],
             accept_multiple_files=True,
-            key="banner_upload"
+            help="첫 번째 이미지는 대표 이미지로, 두 번째 이미지는 썸네일로 사용됩니다."
         )
         
-        if uploaded_banners:
-            st.markdown("### 미리보기")
-            cols = st.columns(min(len(uploaded_banners), 3))
-            for idx, uploaded_file in enumerate(uploaded_banners[:5]):
-                with cols[idx % 3]:
-                    st.image(uploaded_file, use_container_width=True)
-            
-            if st.button("배너 적용", use_container_width=True):
-                banner_list = []
-                for uploaded_file in uploaded_banners[:5]:
-                    bytes_data = uploaded_file.read()
-                    base64_img = base64.b64encode(bytes_data).decode()
-                    banner_list.append(base64_img)
-                
-                settings['banners'] = banner_list
-                save_settings(settings)
-                st.success(f"{len(banner_list)}장의 배너가 업데이트되었습니다!")
-                st.rerun()
-        
-        # 현재 배너 표시
-        st.markdown("---")
-        st.markdown("### 현재 등록된 배너")
-        current_banners = settings.get('banners', [])
-        
-        if current_banners:
-            st.info(f"총 {len(current_banners)}장의 배너가 등록되어 있습니다.")
-            
-            cols = st.columns(min(len(current_banners), 3))
-            for idx, banner_base64 in enumerate(current_banners):
-                with cols[idx % 3]:
-                    st.image(f"data:image/jpeg;base64,{banner_base64}", use_container_width=True)
-            
-            if st.button("모든 배너 제거", type="secondary"):
-                settings['banners'] = []
-                save_settings(settings)
-                st.success("모든 배너가 제거되었습니다!")
-                st.rerun()
+        # 폴더 번호 자동 생성 미리보기
+        folders = get_product_folders()
+        if folders:
+            folder_numbers = [int(f.name) for f in folders]
+            next_folder_num = max(folder_numbers) + 1
         else:
-            st.warning("등록된 배너가 없습니다. 기본 배너가 표시됩니다.")
-    
-    # 공지사항 관리 탭
-    with tab2:
-        st.subheader("공지사항 관리")
-        
-        notice = settings.get('notice', {})
-        
-        notice_enabled = st.checkbox(
-            "공지사항 표시",
-            value=notice.get('enabled', True)
-        )
+            next_folder_num = 126
         
-        notice_title = st.text_input(
-            "공지사항 제목",
-            value=notice.get('title', '공지사항'),
-            placeholder="예: 신상품 입고"
-        )
+        st.info(f"📁 새 상품은 폴더 번호 **{next_folder_num}**에 저장됩니다.")
         
-        notice_content = st.text_area(
-            "공지사항 내용",
-            value=notice.get('content', ''),
-            height=150,
-            placeholder="공지사항 내용을 입력하세요..."
+        allow_duplicates = st.checkbox(
+            "비슷한 이미지가 있어도 그래도 등록",
+            key="new_product_allow_duplicates",
+            help="이미 등록된 상품과 비슷한 이미지가 있으면 경고를 확인한 뒤 체크하고 다시 등록하세요."
         )
         
-        if st.button("공지사항 저장", use_container_width=True):
-            settings['notice'] = {
-                'title': notice_title,
-                'content': notice_content,
-                'enabled': notice_enabled
-            }
-            save_settings(settings)
-            st.success("공지사항이 저장되었습니다!")
-            st.rerun()
-        
-        # 미리보기
-        if notice_enabled:
-            st.markdown("---")
-            st.markdown("### 미리보기")
-            st.markdown(f"""
-            <div class="notice-box">
-                <div class="notice-title">📢 {notice_title}</div>
-                <div class="notice-content">{notice_content}</div>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    # 상품 관리 탭
-    with tab3:
-        st.subheader("상품 정보 관리")
-        
-        # 상품 업로드 섹션
-        st.markdown("### 🆕 새 상품 등록")
+        submit_button = st.form_submit_button("✅ 상품 등록", use_container_width=True)
         
-        with st.form("upload_product_form"):
-            # 상품 정보 입력
-            product_name = st.text_input("상품명", placeholder="예: 반팔 티셔츠")
-            product_info = st.text_input("색상/사이즈", placeholder="예: 블랙/FREE")
-            product_price = st.text_input("가격", placeholder="예: 29,000원")
-            
-            # 이미지 업로드
-            uploaded_files = st.file_uploader(
-                "상품 이미지 업로드 (여러 장 선택 가능)",
-                type=['jpg', 'jpeg', 'png'],
-                accept_multiple_files=True,
-                help="첫 번째 이미지는 대표 이미지로, 두 번째 이미지는 썸네일로 사용됩니다."
-            )
-            
-            # 폴더 번호 자동 생성 미리보기
-            folders = get_product_folders()
-            if folders:
-                folder_numbers = [int(f.name) for f in folders]
-                next_folder_num = max(folder_numbers) + 1
+        if submit_button:
+            if not product_name or not product_info or not product_price:
+                st.error("❌ 모든 상품 정보를 입력해주세요.")
+            elif not uploaded_files:
+                st.error("❌ 최소 1개 이상의 이미지를 업로드해주세요.")
+            elif not allow_duplicates and show_near_duplicate_warning(uploaded_files):
+                st.error("❌ 위 이미지를 확인한 뒤 '비슷한 이미지가 있어도 그래도 등록'을 체크하고 다시 등록해주세요.")
             else:
-                next_folder_num = 126
-            
-            st.info(f"📁 새 상품은 폴더 번호 **{next_folder_num}**에 저장됩니다.")
-            
-            submit_button = st.form_submit_button("✅ 상품 등록", use_container_width=True)
-            
-            if submit_button:
-                if not product_name or not product_info or not product_price:
-                    st.error("❌ 모든 상품 정보를 입력해주세요.")
-                elif not uploaded_files:
-                    st.error("❌ 최소 1개 이상의 이미지를 업로드해주세요.")
-                else:
-                    try:
-                        # 새 폴더 생성
-                        new_folder = IMAGE_DIR / str(next_folder_num)
-                        new_folder.mkdir(parents=True, exist_ok=True)
-                        
-                        # 이미지 저장
-                        for idx, uploaded_file in enumerate(uploaded_files, 1):
-                            img = Image.open(uploaded_file)
-                            img_path = new_folder / f"image_{idx}.jpg"
-                            img.save(img_path, "JPEG")
+                try:
+                    # 새 폴더 생성
+                    new_folder = IMAGE_DIR / str(next_folder_num)
+                    new_folder.mkdir(parents=True, exist_ok=True)
+                    
+                    # 이미지 저장
+                    errors = save_uploaded_images([
+                        (uploaded_file, new_folder / f"image_{idx}.jpg")
+                        for idx, uploaded_file in enumerate(uploaded_files, 1)
+                    ])
+                    saved_count = len(uploaded_files) - len(errors)
+                    
+                    if saved_count == 0:
+                        # 저장된 이미지가 없으면 빈 폴더를 남기지 않음
+                        if not any(new_folder.iterdir()):
+                            new_folder.rmdir()
+                        st.error("❌ 이미지를 하나도 저장하지 못해 상품을 등록하지 않았습니다.")
+                    else:
+                        invalidate_catalog()
                         
                         st.success(f"""
                         ✅ 상품이 성공적으로 등록되었습니다!
                         
                         - **폴더**: {next_folder_num}
                         - **상품명**: {product_name}
-                        - **업로드된 이미지**: {len(uploaded_files)}장
+                        - **업로드된 이미지**: {saved_count}장{f" (실패 {len(errors)}장)" if errors else ""}
                         
-                        이제 [구글 시트](https://docs.google.com/spreadsheets/d/1Cnd19QAMyNEgvEdfXTA1QtW0VMiTRMCBFGmrzKWezNQ/edit?usp=sharing)에 상품 정보를 추가해주세요:
+                        이제 [구글 시트](https://docs.google.com/spreadsheets/d/{SHEET_ID}/edit?usp=sharing)에 상품 정보를 추가해주세요:
+                        - **폴더** 열: {next_folder_num}
                         - **A열**: {product_name}
                         - **B열**: {product_info}
                         - **C열**: {product_price}
                         """)
                         
                         st.info("💡 구글 시트 업데이트 후 '🔄 상품 정보 새로고침' 버튼을 클릭하세요.")
-                        
-                    except Exception as e:
-                        st.error(f"❌ 상품 등록 중 오류가 발생했습니다: {e}")
-        
-        st.markdown("---")
-        
-        # 기존 상품 이미지 수정 섹션
-        st.markdown("### 📸 기존 상품 이미지 관리")
+                    
+                except Exception as e:
+                    st.error(f"❌ 상품 등록 중 오류가 발생했습니다: {e}")
+    
+    st.markdown("---")
+    
+    # 기존 상품 이미지 수정 섹션
+    st.markdown("### 📸 기존 상품 이미지 관리")
+    
+    folders = get_product_folders()
+    if folders and len(folders) > 0:
+        folder_names = [f.name for f in folders]
         
-        folders = get_product_folders()
-        if folders and len(folders) > 0:
-            folder_names = [f.name for f in folders]
+        if len(folder_names) > 0:
+            selected_folder_name = st.selectbox(
+                "수정할 상품 폴더 선택",
+                options=folder_names,
+                help="이미지를 추가하거나 수정할 상품 폴더를 선택하세요."
+            )
             
-            if len(folder_names) > 0:
-                selected_folder_name = st.selectbox(
-                    "수정할 상품 폴더 선택",
-                    options=folder_names,
-                    help="이미지를 추가하거나 수정할 상품 폴더를 선택하세요."
-                )
-                
-                if selected_folder_name:
-                    try:
-                        folder_path = IMAGE_DIR / selected_folder_name
+            if selected_folder_name:
+                try:
+                    folder_path = IMAGE_DIR / selected_folder_name
+                    
+                    if not folder_path.exists():
+                        st.error(f"폴더를 찾을 수 없습니다: {selected_folder_name}")
+                    else:
+                        existing_images = get_folder_images(folder_path)
+                        
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            st.markdown(f"**현재 이미지: {len(existing_images)}장**")
+                            if existing_images:
+                                # 썸네일로 현재 이미지 표시
+                                for i, img_path in enumerate(existing_images[:4], 1):
+                                    try:
+                                        thumbnail = get_image_variants(img_path, THUMBNAIL_WIDTH, THUMBNAIL_QUALITY)["jpeg"]
+                                        st.image(str(thumbnail), caption=f"image_{i}.jpg", width=100)
+                                    except:
+                                        pass
+                                if len(existing_images) > 4:
+                                    st.info(f"외 {len(existing_images) - 4}장 더 있음")
                         
-                        if not folder_path.exists():
-                            st.error(f"폴더를 찾을 수 없습니다: {selected_folder_name}")
-                        else:
-                            existing_images = get_folder_images(folder_path)
-                            
-                            col1, col2 = st.columns(2)
-                            
-                            with col1:
-                                st.markdown(f"**현재 이미지: {len(existing_images)}장**")
-                                if existing_images:
-                                    # 썸네일로 현재 이미지 표시
-                                    for i, img_path in enumerate(existing_images[:4], 1):
-                                        try:
-                                            img = Image.open(img_path)
-                                            st.image(img, caption=f"image_{i}.jpg", width=100)
-                                        except:
-                                            pass
-                                    if len(existing_images) > 4:
-                                        st.info(f"외 {len(existing_images) - 4}장 더 있음")
-                            
-                            with col2:
-                                with st.form(f"update_product_images_{selected_folder_name}"):
-                                    st.markdown("**새 이미지 업로드**")
-                                    new_images = st.file_uploader(
-                                        "추가할 이미지 선택",
-                                        type=['jpg', 'jpeg', 'png'],
-                                        accept_multiple_files=True,
-                                        key=f"uploader_{selected_folder_name}"
-                                    )
-                                    
-                                    replace_mode = st.checkbox("기존 이미지 모두 삭제하고 교체")
-                                    
-                                    update_button = st.form_submit_button("🔄 이미지 업데이트", use_container_width=True)
-                                    
-                                    if update_button and new_images:
-                                        try:
+                        with col2:
+                            with st.form(f"update_product_images_{selected_folder_name}"):
+                                st.markdown("**새 이미지 업로드**")
+                                new_images = st.file_uploader(
+                                    "추가할 이미지 선택",
+                                    type=['jpg', 'jpeg', 'png'],
+                                    accept_multiple_files=True,
+                                    key=f"uploader_{selected_folder_name}"
+                                )
+                                
+                                replace_mode = st.checkbox("기존 이미지 모두 삭제하고 교체")
+                                allow_duplicates = st.checkbox(
+                                    "비슷한 이미지가 있어도 그래도 업데이트",
+                                    key=f"allow_duplicates_{selected_folder_name}"
+                                )
+                                
+                                update_button = st.form_submit_button("🔄 이미지 업데이트", use_container_width=True)
+                                
+                                if update_button and new_images and not allow_duplicates and show_near_duplicate_warning(
+                                    new_images,
+                                    exclude_folder=folder_path if replace_mode else None
+                                ):
+                                    st.error("❌ 위 이미지를 확인한 뒤 '비슷한 이미지가 있어도 그래도 업데이트'를 체크하고 다시 업데이트해주세요.")
+                                elif update_button and new_images:
+                                    try:
+                                        # 교체 모드는 image_1부터 덮어쓰고, 기존 이미지는 유지한 채 새 번호부터 추가
+                                        start_idx = 1 if replace_mode else len(existing_images) + 1
+                                        
+                                        # 새 이미지 저장
+                                        items = [
+                                            (uploaded_file, folder_path / f"image_{idx}.jpg")
+                                            for idx, uploaded_file in enumerate(new_images, start_idx)
+                                        ]
+                                        errors = save_uploaded_images(items)
+                                        failed_paths = {dest_path for dest_path, _ in errors}
+                                        saved_paths = {dest_path for _, dest_path in items if dest_path not in failed_paths}
+                                        
+                                        if not saved_paths:
+                                            st.error("❌ 이미지를 하나도 저장하지 못했습니다. 기존 이미지는 그대로 유지됩니다.")
+                                        else:
                                             if replace_mode:
-                                                # 기존 이미지 삭제
+                                                # 새 이미지가 저장된 뒤에만 나머지 기존 이미지 삭제
                                                 for img in existing_images:
-                                                    img.unlink()
-                                                start_idx = 1
-                                                st.info("기존 이미지를 모두 삭제했습니다.")
-                                            else:
-                                                # 기존 이미지 유지, 새 번호부터 시작
-                                                start_idx = len(existing_images) + 1
+                                                    if img not in saved_paths:
+                                                        img.unlink(missing_ok=True)
+                                                st.info("기존 이미지를 모두 교체했습니다.")
                                             
-                                            # 새 이미지 저장
-                                            for idx, uploaded_file in enumerate(new_images, start_idx):
-                                                img = Image.open(uploaded_file)
-                                                img_path = folder_path / f"image_{idx}.jpg"
-                                                img.save(img_path, "JPEG")
-                                            
-                                            st.success(f"✅ {len(new_images)}장의 이미지가 업데이트되었습니다!")
-                                            st.rerun()
-                                            
-                                        except Exception as e:
-                                            st.error(f"❌ 이미지 업데이트 중 오류: {e}")
-                    except Exception as e:
-                        st.error(f"❌ 오류가 발생했습니다: {e}")
-            else:
-                st.warning("등록된 상품 폴더가 없습니다.")
+                                            invalidate_catalog()
+                                            st.success(f"✅ {len(saved_paths)}장의 이미지가 업데이트되었습니다!")
+                                            if not errors:
+                                                st.rerun()
+                                        
+                                    except Exception as e:
+                                        st.error(f"❌ 이미지 업데이트 중 오류: {e}")
+                except Exception as e:
+                    st.error(f"❌ 오류가 발생했습니다: {e}")
         else:
-            st.warning("등록된 상품이 없습니다.")
-        
-        st.markdown("---")
-        
-        # 기존 상품 관리 섹션
-        st.markdown("### 📋 등록된 상품 관리")
-        
-        st.markdown("""
-        상품 정보는 구글 시트에서 관리됩니다.
-        
-        **[구글 시트 바로가기](https://docs.google.com/spreadsheets/d/1Cnd19QAMyNEgvEdfXTA1QtW0VMiTRMCBFGmrzKWezNQ/edit?usp=sharing)**
-        
-        - **A열**: 상품명
-        - **B열**: 색상/사이즈
-        - **C열**: 가격
-        
-        구글 시트에서 정보를 수정한 후 아래 버튼을 클릭하여 새로고침하세요.
-        """)
-        
-        if st.button("🔄 상품 정보 새로고침", use_container_width=True):
-            st.cache_data.clear()
-            st.success("상품 정보가 새로고침되었습니다!")
-            st.rerun()
-        
-        # 현재 상품 목록 표시
-        st.markdown("---")
-        st.markdown("#### 현재 등록된 상품 목록")
-        df = load_google_sheet_data()
-        st.dataframe(df, use_container_width=True)
-        
-        # 상품 폴더 정보
-        st.markdown("---")
-        st.markdown("#### 상품 이미지 폴더")
-        folders = get_product_folders()
-        st.info(f"총 {len(folders)}개의 상품 폴더가 있습니다.")
-        
-        folder_names = [f.name for f in folders]
-        st.write(", ".join(folder_names))
+            st.warning("등록된 상품 폴더가 없습니다.")
+    else:
+        st.warning("등록된 상품이 없습니다.")
     
-    # 사업자 정보 관리 탭
-    with tab4:
-        st.subheader("사업자 정보 관리")
-        
-        business_info = settings.get('business_info', {})
-        
-        business_enabled = st.checkbox(
-            "사업자 정보 표시",
-            value=business_info.get('enabled', True)
-        )
-        
-        col_a, col_b = st.columns(2)
-        
-        with col_a:
-            company_name = st.text_input(
-                "상호",
-                value=business_info.get('company_name', 'OUR Shop')
-            )
-            ceo_name = st.text_input(
-                "대표자",
-                value=business_info.get('ceo_name', '')
-            )
-            business_number = st.text_input(
-                "사업자등록번호",
-                value=business_info.get('business_number', '')
-            )
-            address = st.text_input(
-                "주소",
-                value=business_info.get('address', '')
-            )
-        
-        with col_b:
-            phone = st.text_input(
-                "전화번호",
-                value=business_info.get('phone', '')
-            )
-            kakao_id = st.text_input(
-                "카카오톡 ID",
-                value=business_info.get('kakao_id', ''),
-                placeholder="예: @oahu_shop"
-            )
-            instagram_id = st.text_input(
-                "인스타그램 ID",
-                value=business_info.get('instagram_id', ''),
-                placeholder="예: @oahu.official"
+    st.markdown("---")
+    
+    # 메인 페이지 표시 설정
+    st.markdown("### 🧮 메인 페이지 표시 설정")
+    
+    products_per_page = st.number_input(
+        "한 페이지에 표시할 상품 수",
+        min_value=3,
+        max_value=60,
+        step=3,
+        value=settings.get('products_per_page', 12),
+        help="메인 페이지에서 한 번에 불러올 상품 수입니다. 나머지 상품은 페이지 이동으로 확인합니다."
+    )
+    
+    if st.button("💾 표시 설정 저장", use_container_width=True):
+        settings['products_per_page'] = products_per_page
+        save_admin_settings(settings)
+        st.success(f"한 페이지에 {products_per_page}개씩 표시됩니다!")
+        st.rerun()
+    
+    st.markdown("---")
+    
+    # 중복 이미지 정리 섹션
+    st.markdown("### 🧬 중복 이미지 정리")
+    st.markdown("내용이 같은 상품 이미지를 하나의 저장소 파일로 연결해서 디스크와 브라우저 캐시를 한 번만 사용하도록 합니다.")
+    
+    if st.button("🔍 중복 이미지 검사 및 정리", use_container_width=True):
+        with st.spinner("상품 이미지를 검사하는 중..."):
+            duplicate_groups, saved_bytes = dedupe_image_library()
+        if duplicate_groups:
+            st.success(
+                f"✅ 중복 이미지 {len(duplicate_groups)}묶음을 찾았습니다. "
+                f"이번 정리로 {saved_bytes / 1024 / 1024:.1f}MB를 절약했습니다."
             )
-            wechat_id = st.text_input(
-                "위챗 ID",
-                value=business_info.get('wechat_id', ''),
-                placeholder="예: oahu_wechat"
+            with st.expander("중복 이미지 목록", expanded=False):
+                for paths in duplicate_groups:
+                    st.write(", ".join(f"{path.parent.name}/{path.name}" for path in paths))
+        else:
+            st.info("중복 이미지가 없습니다.")
+    
+    st.markdown("---")
+    
+    # 이미지 일괄 최적화 섹션
+    st.markdown("### 🗜️ 이미지 일괄 최적화")
+    st.markdown(
+        "상품 이미지를 화질 기준(SSIM)에 맞춰 다시 압축하고 EXIF/ICC 메타데이터를 제거합니다. "
+        "원본은 `data/originals/`에 백업되고, 이미 최적화한 이미지는 건너뜁니다."
+    )
+    
+    target_ssim = st.slider(
+        "목표 화질 (SSIM)",
+        min_value=0.95,
+        max_value=0.995,
+        value=OPTIMIZE_TARGET_SSIM,
+        step=0.005,
+        format="%.3f",
+        help="값이 높을수록 원본에 가깝고 용량 절감은 줄어듭니다."
+    )
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("🗜️ 일괄 최적화 실행", use_container_width=True):
+            progress_bar = st.progress(0.0, text="최적화할 이미지를 확인하는 중...")
+            
+            def on_progress(done, total, result):
+                progress_bar.progress(done / total, text=f"이미지 최적화 중... ({done}/{total})")
+            
+            summary = optimize_library(target_ssim=target_ssim, on_progress=on_progress, blob_dir=STATIC_ASSET_DIR)
+            progress_bar.empty()
+            if summary["optimized"]:
+                invalidate_catalog()
+            
+            saved_bytes = summary["before"] - summary["after"]
+            total_saved_bytes = summary["total_before"] - summary["total_after"]
+            st.success(
+                f"✅ {summary['checked']}개 검사, {summary['optimized']}개 최적화 "
+                f"(변경 없는 {summary['skipped_unchanged']}개 건너뜀). "
+                f"이번에 {saved_bytes / 1024 / 1024:.1f}MB, "
+                f"지금까지 총 {total_saved_bytes / 1024 / 1024:.1f}MB를 절약했습니다."
             )
-        
-        if st.button("사업자 정보 저장", use_container_width=True):
-            settings['business_info'] = {
-                'company_name': company_name,
-                'ceo_name': ceo_name,
-                'business_number': business_number,
-                'address': address,
-                'phone': phone,
-                'kakao_id': kakao_id,
-                'instagram_id': instagram_id,
-                'wechat_id': wechat_id,
-                'enabled': business_enabled
-            }
-            save_settings(settings)
-            st.success("사업자 정보가 저장되었습니다!")
+            if summary["errors"]:
+                st.error(f"❌ {summary['errors']}개 이미지를 처리하지 못했습니다. 보고서를 확인해주세요.")
+            if summary["report"].exists():
+                with st.expander("전후 용량 보고서 (누적)", expanded=False):
+                    st.dataframe(pd.read_csv(summary["report"]), use_container_width=True, hide_index=True)
+                    st.download_button(
+                        "📥 보고서 다운로드 (CSV)",
+                        data=summary["report"].read_bytes(),
+                        file_name="optimize_report.csv",
+                        mime="text/csv"
+                    )
+    with col2:
+        if st.button("↩️ 원본으로 되돌리기", use_container_width=True, disabled=not OPTIMIZE_BACKUP_DIR.exists()):
+            restored = restore_originals(blob_dir=STATIC_ASSET_DIR)
+            invalidate_catalog()
+            st.success(f"✅ 원본 이미지 {restored}개를 복원했습니다.")
+    
+    st.markdown("---")
+    
+    # 기존 상품 관리 섹션
+    st.markdown("### 📋 등록된 상품 관리")
+    
+    st.markdown(f"""
+    상품 정보는 구글 시트에서 관리됩니다.
+    
+    **[구글 시트 바로가기](https://docs.google.com/spreadsheets/d/{SHEET_ID}/edit?usp=sharing)**
+    
+    - **A열**: 상품명
+    - **B열**: 색상/사이즈
+    - **C열**: 가격
+    - **폴더** 열 (선택): 상품 이미지 폴더 번호. 이 열이 있으면 행 순서와 상관없이 폴더 번호로 상품 정보를 연결합니다.
+    
+    구글 시트에서 정보를 수정한 후 아래 버튼을 클릭하여 새로고침하세요.
+    """)
+    
+    sheet_state = get_sheet_state()
+    if sheet_state["loaded_at"]:
+        loaded_at = datetime.fromtimestamp(sheet_state["loaded_at"]).strftime("%Y-%m-%d %H:%M:%S")
+        st.caption(f"마지막으로 불러온 시각: {loaded_at}")
+    if sheet_state["error"]:
+        st.warning(f"최근 새로고침 실패 (저장된 데이터를 사용 중): {sheet_state['error']}")
+    
+    if st.button("🔄 상품 정보 새로고침", use_container_width=True):
+        try:
+            with st.spinner("구글 시트에서 상품 정보를 불러오는 중..."):
+                refresh_sheet_data()
+            invalidate_catalog()
+            st.success("상품 정보가 새로고침되었습니다!")
             st.rerun()
+        except Exception as e:
+            st.error(f"❌ 상품 정보를 불러오지 못했습니다: {e}")
+    
+    sheet_refresh_minutes = st.number_input(
+        "자동 새로고침 주기 (분)",
+        min_value=1,
+        max_value=1440,
+        value=max(1, settings.get('sheet_refresh_interval', 300) // 60),
+        help="저장된 상품 정보가 이 시간보다 오래되면 방문자를 기다리게 하지 않고 백그라운드에서 새로 불러옵니다."
+    )
+    
+    if sheet_refresh_minutes * 60 != settings.get('sheet_refresh_interval', 300):
+        settings['sheet_refresh_interval'] = sheet_refresh_minutes * 60
+        save_admin_settings(settings)
+        st.success(f"상품 정보가 {sheet_refresh_minutes}분마다 자동으로 새로고침됩니다!")
+    
+    # 현재 상품 목록 표시
+    st.markdown("---")
+    st.markdown("#### 현재 등록된 상품 목록")
+    df = load_google_sheet_data()
+    st.dataframe(df, use_container_width=True)
     
-    # 문의 양식 관리 탭
-    with tab5:
-        st.subheader("문의 양식 관리")
-        
-        st.markdown("문의 페이지에서 고객이 입력할 항목을 설정합니다.")
-        
-        form_fields = settings.get('inquiry_form_fields', [])
-        
-        st.markdown("#### 현재 양식 항목")
-        
-        for idx, field in enumerate(form_fields):
-            with st.expander(f"📝 {field['label']}", expanded=False):
-                col1, col2 = st.columns([3, 1])
-                
-                with col1:
-                    st.write(f"**ID**: {field['id']}")
-                    st.write(f"**유형**: {field['type']}")
-                    st.write(f"**필수**: {'예' if field.get('required', False) else '아니오'}")
-                
-                with col2:
-                    if st.button("삭제", key=f"del_field_{idx}"):
-                        form_fields.pop(idx)
-                        settings['inquiry_form_fields'] = form_fields
-                        save_settings(settings)
-                        st.success("항목이 삭제되었습니다!")
-                        st.rerun()
-        
-        st.markdown("---")
-        st.markdown("#### 새 항목 추가")
-        
-        with st.form("add_field_form"):
-            new_field_id = st.text_input("항목 ID (영문, 공백없이)", placeholder="예: product_name")
-            new_field_label = st.text_input("항목 라벨", placeholder="예: 관심 상품")
-            new_field_type = st.selectbox("항목 유형", ["text", "email", "textarea"])
-            new_field_required = st.checkbox("필수 항목")
+    # 상품 폴더 정보
+    st.markdown("---")
+    st.markdown("#### 상품 이미지 폴더")
+    folders = get_product_folders()
+    st.info(f"총 {len(folders)}개의 상품 폴더가 있습니다.")
+    
+    folder_names = [f.name for f in folders]
+    st.write(", ".join(folder_names))
+
+# 관리자 - 사업자 정보 관리 섹션
+@st.fragment
+def show_admin_business_section():
+    settings = load_admin_settings()
+    
+    st.subheader("사업자 정보 관리")
+    
+    business_info = settings.get('business_info', {})
+    
+    business_enabled = st.checkbox(
+        "사업자 정보 표시",
+        value=business_info.get('enabled', True)
+    )
+    
+    col_a, col_b = st.columns(2)
+    
+    with col_a:
+        company_name = st.text_input(
+            "상호",
+            value=business_info.get('company_name', 'OUR Shop')
+        )
+        ceo_name = st.text_input(
+            "대표자",
+            value=business_info.get('ceo_name', '')
+        )
+        business_number = st.text_input(
+            "사업자등록번호",
+            value=business_info.get('business_number', '')
+        )
+        address = st.text_input(
+            "주소",
+            value=business_info.get('address', '')
+        )
+    
+    with col_b:
+        phone = st.text_input(
+            "전화번호",
+            value=business_info.get('phone', '')
+        )
+        kakao_id = st.text_input(
+            "카카오톡 ID",
+            value=business_info.get('kakao_id', ''),
+            placeholder="예: @oahu_shop"
+        )
+        instagram_id = st.text_input(
+            "인스타그램 ID",
+            value=business_info.get('instagram_id', ''),
+            placeholder="예: @oahu.official"
+        )
+        wechat_id = st.text_input(
+            "위챗 ID",
+            value=business_info.get('wechat_id', ''),
+            placeholder="예: oahu_wechat"
+        )
+    
+    if st.button("사업자 정보 저장", use_container_width=True):
+        settings['business_info'] = {
+            'company_name': company_name,
+            'ceo_name': ceo_name,
+            'business_number': business_number,
+            'address': address,
+            'phone': phone,
+            'kakao_id': kakao_id,
+            'instagram_id': instagram_id,
+            'wechat_id': wechat_id,
+            'enabled': business_enabled
+        }
+        save_admin_settings(settings)
+        st.success("사업자 정보가 저장되었습니다!")
+        st.rerun()
+
+# 관리자 - 문의 양식 관리 섹션
+@st.fragment
+def show_admin_inquiry_form_section():
+    settings = load_admin_settings()
+    
+    st.subheader("문의 양식 관리")
+    
+    st.markdown("문의 페이지에서 고객이 입력할 항목을 설정합니다.")
+    
+    form_fields = settings.get('inquiry_form_fields', [])
+    
+    st.markdown("#### 현재 양식 항목")
+    
+    for idx, field in enumerate(form_fields):
+        with st.expander(f"📝 {field['label']}", expanded=False):
+            col1, col2 = st.columns([3, 1])
+            
+            with col1:
+                st.write(f"**ID**: {field['id']}")
+                st.write(f"**유형**: {field['type']}")
+                st.write(f"**필수**: {'예' if field.get('required', False) else '아니오'}")
             
-            if st.form_submit_button("항목 추가"):
-                if new_field_id and new_field_label:
-                    new_field = {
-                        'id': new_field_id,
-                        'label': new_field_label,
-                        'type': new_field_type,
-                        'required': new_field_required
-                    }
-                    form_fields.append(new_field)
+            with col2:
+                if st.button("삭제", key=f"del_field_{idx}"):
+                    form_fields.pop(idx)
                     settings['inquiry_form_fields'] = form_fields
-                    save_settings(settings)
-                    st.success("새 항목이 추가되었습니다!")
+                    save_admin_settings(settings)
+                    st.success("항목이 삭제되었습니다!")
                     st.rerun()
-                else:
-                    st.error("ID와 라벨을 모두 입력해주세요.")
     
-    # 문의 내역 탭
-    with tab6:
-        st.subheader("고객 문의 내역")
-        
-        inquiries_data = load_inquiries()
-        inquiries_list = inquiries_data.get('inquiries', [])
-        
-        if inquiries_list:
-            st.info(f"총 {len(inquiries_list)}건의 문의가 있습니다.")
-            
-            for inquiry in reversed(inquiries_list):
-                with st.expander(
-                    f"📧 {inquiry.get('subject', '제목 없음')} - {inquiry.get('timestamp', '')}",
-                    expanded=False
-                ):
-                    for key, value in inquiry.items():
-                        if key not in ['id', 'timestamp']:
-                            st.write(f"**{key}**: {value}")
-        else:
-            st.info("아직 문의 내역이 없습니다.")
+    st.markdown("---")
+    st.markdown("#### 새 항목 추가")
+    
+    with st.form("add_field_form"):
+        new_field_id = st.text_input("항목 ID (영문, 공백없이)", placeholder="예: product_name")
+        new_field_label = st.text_input("항목 라벨", placeholder="예: 관심 상품")
+        new_field_type = st.selectbox("항목 유형", ["text", "email", "textarea"])
+        new_field_required = st.checkbox("필수 항목")
+        
+        if st.form_submit_button("항목 추가"):
+            if new_field_id and new_field_label:
+                new_field = {
+                    'id': new_field_id,
+                    'label': new_field_label,
+                    'type': new_field_type,
+                    'required': new_field_required
+                }
+                form_fields.append(new_field)
+                settings['inquiry_form_fields'] = form_fields
+                save_admin_settings(settings)
+                st.success("새 항목이 추가되었습니다!")
+                st.rerun()
+            else:
+                st.error("ID와 라벨을 모두 입력해주세요.")
+
+# 관리자 - 문의 내역 섹션
+@st.fragment
+def show_admin_inquiry_section():
+    st.subheader("고객 문의 내역")
     
-    # Git 업데이트 탭
-    with tab7:
-        st.subheader("Git 업데이트")
-        
-        st.markdown("""
-        새 상품 이미지를 추가하거나 파일을 수정한 후 GitHub에 업로드합니다.
-        
-        **주의**: 이 기능은 로컬 환경에서만 작동합니다.
-        Streamlit Cloud에서는 GitHub 웹 인터페이스를 사용하세요.
-        """)
-        
-        commit_message = st.text_input(
-            "커밋 메시지",
-            value="Update products and settings",
-            placeholder="예: Add new product images"
-        )
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("📝 Git Status", use_container_width=True):
-                try:
-                    result = subprocess.run(
-                        ['git', 'status', '--short'],
-                        capture_output=True,
-                        text=True,
-                        cwd=Path.cwd()
+    # 검색 조건
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        inquiry_query = st.text_input("검색 (제목/내용)", placeholder="검색어를 입력하세요")
+    with col2:
+        inquiry_statuses = st.multiselect("처리 상태", INQUIRY_STATUSES, default=INQUIRY_STATUSES)
+    with col3:
+        inquiry_dates = st.date_input("접수 기간", value=())
+    
+    date_from = inquiry_dates[0] if len(inquiry_dates) > 0 else None
+    date_to = inquiry_dates[1] if len(inquiry_dates) > 1 else date_from
+    
+    # 검색 조건이 바뀌면 첫 페이지로 이동
+    filter_key = (inquiry_query, tuple(inquiry_statuses), date_from, date_to)
+    if st.session_state.get('inquiry_filter_key') != filter_key:
+        st.session_state.inquiry_filter_key = filter_key
+        st.session_state.inquiry_page = 1
+    
+    inquiry_page = st.session_state.get('inquiry_page', 1)
+    total, inquiries_list = search_inquiries(inquiry_query, inquiry_statuses, date_from, date_to, page=inquiry_page)
+    total_pages = max(1, (total + INQUIRIES_PER_PAGE - 1) // INQUIRIES_PER_PAGE)
+    if inquiry_page > total_pages:
+        inquiry_page = total_pages
+        st.session_state.inquiry_page = inquiry_page
+        total, inquiries_list = search_inquiries(inquiry_query, inquiry_statuses, date_from, date_to, page=inquiry_page)
+    
+    if total > 0:
+        st.info(f"검색 결과 {total}건의 문의가 있습니다. ({inquiry_page} / {total_pages} 페이지)")
+        
+        for inquiry in inquiries_list:
+            with st.expander(
+                f"📧 [{inquiry.get('status', '')}] {inquiry.get('subject', '제목 없음')} - {inquiry.get('timestamp', '')}",
+                expanded=False
+            ):
+                for key, value in inquiry.items():
+                    if key not in ['id', 'timestamp', 'status']:
+                        st.write(f"**{key}**: {value}")
+                
+                col_a, col_b = st.columns([3, 1])
+                with col_a:
+                    new_status = st.selectbox(
+                        "처리 상태",
+                        INQUIRY_STATUSES,
+                        index=INQUIRY_STATUSES.index(inquiry['status']) if inquiry['status'] in INQUIRY_STATUSES else 0,
+                        key=f"inquiry_status_{inquiry['id']}"
                     )
-                    if result.stdout:
-                        st.code(result.stdout, language="text")
-                    else:
-                        st.success("변경사항이 없습니다.")
-                except Exception as e:
-                    st.error(f"오류: {e}")
+                with col_b:
+                    if st.button("상태 저장", key=f"inquiry_status_save_{inquiry['id']}", use_container_width=True):
+                        update_inquiry_status(inquiry['id'], new_status)
+                        st.success("처리 상태가 변경되었습니다!")
+                        st.rerun()
         
-        with col2:
-            if st.button("✅ Git Commit", use_container_width=True):
-                try:
-                    # Add all changes
-                    subprocess.run(['git', 'add', '-A'], check=True, cwd=Path.cwd())
-                    
-                    # Commit
-                    result = subprocess.run(
-                        ['git', 'commit', '-m', commit_message],
-                        capture_output=True,
-                        text=True,
-                        cwd=Path.cwd()
-                    )
+        st.number_input(
+            f"페이지 (전체 {total_pages}페이지)",
+            min_value=1,
+            max_value=total_pages,
+            key="inquiry_page"
+        )
+    elif inquiry_query or date_from or len(inquiry_statuses) < len(INQUIRY_STATUSES):
+        st.info("검색 조건에 맞는 문의가 없습니다.")
+    else:
+        st.info("아직 문의 내역이 없습니다.")
+
+# 관리자 - Git 업데이트 섹션
+@st.fragment
+def show_admin_git_section():
+    st.subheader("Git 업데이트")
+    
+    st.markdown("""
+    새 상품 이미지를 추가하거나 파일을 수정한 후 GitHub에 업로드합니다.
+    
+    **주의**: 이 기능은 로컬 환경에서만 작동합니다.
+    Streamlit Cloud에서는 GitHub 웹 인터페이스를 사용하세요.
+    """)
+    
+    commit_message = st.text_input(
+        "커밋 메시지",
+        value="Update products and settings",
+        placeholder="예: Add new product images"
+    )
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        if st.button("📝 Git Status", use_container_width=True):
+            try:
+                result = subprocess.run(
+                    ['git', 'status', '--short'],
+                    capture_output=True,
+                    text=True,
+                    cwd=Path.cwd()
+                )
+                if result.stdout:
+                    st.code(result.stdout, language="text")
+                else:
+                    st.success("변경사항이 없습니다.")
+            except Exception as e:
+                st.error(f"오류: {e}")
+    
+    with col2:
+        if st.button("✅ Git Commit", use_container_width=True):
+            try:
+                # Add all changes
+                subprocess.run(['git', 'add', '-A'], check=True, cwd=Path.cwd())
+                
+                # Commit
+                result = subprocess.run(
+                    ['git', 'commit', '-m', commit_message],
+                    capture_output=True,
+                    text=True,
+                    cwd=Path.cwd()
+                )
+                
+                if result.returncode == 0:
+                    st.success("커밋이 완료되었습니다!")
+                    st.code(result.stdout, language="text")
+                else:
+                    st.warning("커밋할 변경사항이 없거나 이미 커밋되었습니다.")
+            except Exception as e:
+                st.error(f"오류: {e}")
+    
+    with col3:
+        if st.button("🚀 Git Push", use_container_width=True):
+            try:
+                result = subprocess.run(
+                    ['git', 'push'],
+                    capture_output=True,
+                    text=True,
+                    cwd=Path.cwd()
+                )
+                
+                if result.returncode == 0:
+                    st.success("GitHub에 푸시되었습니다!")
+                    st.info("Streamlit Cloud가 자동으로 재배포를 시작합니다.")
+                    st.code(result.stdout, language="text")
+                else:
+                    st.error("푸시 실패")
+                    st.code(result.stderr, language="text")
+            except Exception as e:
+                st.error(f"오류: {e}")
+    
+    st.markdown("---")
+    st.markdown("#### 한 번에 실행")
+    
+    if st.button("🔄 Add → Commit → Push", use_container_width=True, type="primary"):
+        try:
+            with st.spinner("Git 업데이트 중..."):
+                # Add
+                subprocess.run(['git', 'add', '-A'], check=True, cwd=Path.cwd())
+                st.success("✅ 파일 추가 완료")
+                
+                # Commit
+                result = subprocess.run(
+                    ['git', 'commit', '-m', commit_message],
+                    capture_output=True,
+                    text=True,
+                    cwd=Path.cwd()
+                )
+                
+                if result.returncode == 0:
+                    st.success("✅ 커밋 완료")
                     
-                    if result.returncode == 0:
-                        st.success("커밋이 완료되었습니다!")
-                        st.code(result.stdout, language="text")
-                    else:
-                        st.warning("커밋할 변경사항이 없거나 이미 커밋되었습니다.")
-                except Exception as e:
-                    st.error(f"오류: {e}")
-        
-        with col3:
-            if st.button("🚀 Git Push", use_container_width=True):
-                try:
+                    # Push
                     result = subprocess.run(
                         ['git', 'push'],
                         capture_output=True,
@@ -1315,72 +3008,94 @@ def show_admin_page():
                     )
                     
                     if result.returncode == 0:
-                        st.success("GitHub에 푸시되었습니다!")
-                        st.info("Streamlit Cloud가 자동으로 재배포를 시작합니다.")
-                        st.code(result.stdout, language="text")
+                        st.success("✅ GitHub 푸시 완료!")
+                        st.balloons()
+                        st.info("Streamlit Cloud가 자동으로 재배포를 시작합니다. 약 2-3분 소요됩니다.")
                     else:
                         st.error("푸시 실패")
                         st.code(result.stderr, language="text")
-                except Exception as e:
-                    st.error(f"오류: {e}")
-        
-        st.markdown("---")
-        st.markdown("#### 한 번에 실행")
-        
-        if st.button("🔄 Add → Commit → Push", use_container_width=True, type="primary"):
-            try:
-                with st.spinner("Git 업데이트 중..."):
-                    # Add
-                    subprocess.run(['git', 'add', '-A'], check=True, cwd=Path.cwd())
-                    st.success("✅ 파일 추가 완료")
-                    
-                    # Commit
-                    result = subprocess.run(
-                        ['git', 'commit', '-m', commit_message],
-                        capture_output=True,
-                        text=True,
-                        cwd=Path.cwd()
-                    )
-                    
-                    if result.returncode == 0:
-                        st.success("✅ 커밋 완료")
-                        
-                        # Push
-                        result = subprocess.run(
-                            ['git', 'push'],
-                            capture_output=True,
-                            text=True,
-                            cwd=Path.cwd()
-                        )
-                        
-                        if result.returncode == 0:
-                            st.success("✅ GitHub 푸시 완료!")
-                            st.balloons()
-                            st.info("Streamlit Cloud가 자동으로 재배포를 시작합니다. 약 2-3분 소요됩니다.")
-                        else:
-                            st.error("푸시 실패")
-                            st.code(result.stderr, language="text")
-                    else:
-                        st.warning("커밋할 변경사항이 없습니다.")
-            except Exception as e:
-                st.error(f"오류: {e}")
+                else:
+                    st.warning("커밋할 변경사항이 없습니다.")
+        except Exception as e:
+            st.error(f"오류: {e}")
 
-# 메인 라우팅
-def main():
+# 관리자 페이지
+def show_admin_page():
+    if not st.session_state.logged_in:
+        st.session_state.page = 'login'
+        st.rerun()
+        return
+    
+    st.markdown('<div class="header">⚙️ 관리자 페이지</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        if st.button("← 메인 페이지로"):
+            st.session_state.page = 'home'
+            st.rerun()
+    
+    with col2:
+        if st.button("로그아웃"):
+            st.session_state.logged_in = False
+            st.session_state.page = 'home'
+            st.rerun()
+    
+    st.markdown("---")
+    
+    # 관리 메뉴 (선택한 섹션만 데이터를 불러오고, 섹션 안의 조작은 해당 섹션만 다시 실행)
+    sections = {
+        "🏪 상점명 & 배너": show_admin_banner_section,
+        "📢 공지사항": show_admin_notice_section,
+        "📦 상품 관리": show_admin_product_section,
+        "🏢 사업자 정보": show_admin_business_section,
+        "📧 문의 양식": show_admin_inquiry_form_section,
+        "💬 문의 내역": show_admin_inquiry_section,
+        "🔄 Git 업데이트": show_admin_git_section
+    }
+    section = st.radio(
+        "관리 메뉴",
+        list(sections.keys()),
+        horizontal=True,
+        key="admin_section",
+        label_visibility="collapsed"
+    )
+    
+    st.markdown("---")
+    
+    sections[section]()
+
+# 스토어 화면 (홈/상세/문의) - 화면 이동 버튼은 이 fragment만 다시 실행
+@st.fragment(key=STOREFRONT_FRAGMENT)
+def show_storefront():
     page = st.session_state.page
     
-    if page == 'home':
-        show_main_page()
-    elif page == 'detail':
-        show_detail_page()
+    # 상세/문의 페이지는 URL로 결정 (?product=133, ?view=inquiry) - 링크 공유, 새로고침해도 유지
+    # (정적 사이트로 내보낸 스토어의 문의하기 링크도 ?view=inquiry로 연결됨)
+    product_id = st.query_params.get("product")
+    if page == 'home' and st.query_params.get("view") == "inquiry":
+        page = st.session_state.page = 'inquiry'
+    
+    if product_id and page == 'home':
+        show_detail_page(product_id)
     elif page == 'inquiry':
         show_inquiry_page()
-    elif page == 'login':
+    else:
+        show_main_page()
+
+# 메인 라우팅
+def main():
+    page = st.session_state.page
+    
+    if page == 'login':
         show_login_page()
     elif page == 'admin':
         show_admin_page()
     else:
-        show_main_page()
+        # 아직 없는 축소 이미지는 백그라운드에서 미리 생성
+        if STATIC_SERVING:
+            warm_library_derivatives(get_catalog_manifest()["version"])
+        show_storefront()
 
 if __name__ == "__main__":
     main()
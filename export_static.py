@@ -0,0 +1,339 @@
+# 정적 스토어 내보내기
+# - 홈(상품 목록 페이지), 상품 상세 페이지, 문의하기 링크를 정적 HTML 사이트로 만듦
+# - 앱과 같은 데이터 함수(load_settings, load_google_sheet_data, get_product_folders)와 HTML 생성 함수 사용
+# - 이미지/배너/ZIP은 내용 해시 파일명으로 assets/에 복사 (정적 파일 서버에서 장기 캐시 가능)
+# - 상품 폴더나 시트 행이 바뀐 상품 페이지만 다시 만듦 (export_manifest.json)
+# 고객 화면은 정적 파일 서버로 제공하고, Streamlit 앱은 관리자와 문의 접수에만 사용
+#
+# 명령줄 사용법:
+#   python export_static.py --app-url https://our-shop.streamlit.app/ [--output site] [--offline]
+#   (STOREFRONT_APP_URL 환경 변수가 있으면 --app-url 생략 가능)
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from streamlit import config as streamlit_config, logger as streamlit_logger
+
+# 앱 모듈을 Streamlit 런타임 밖에서 불러올 때 나오는 경고 숨김
+# (설정 파일을 읽으면서 로그 수준을 logger.level로 되돌리므로 읽기 전후에 모두 지정)
+streamlit_logger.set_log_level("error")
+streamlit_config.get_option("logger.level")
+streamlit_logger.set_log_level("error")
+
+import app
+from image_pipeline import create_derivative, get_process_context, get_tmp_path, store_blob
+
+# 내보내기 기본 경로
+EXPORT_DIR = Path("site")
+EXPORT_MANIFEST_NAME = "export_manifest.json"
+
+# 페이지 구조가 바뀌면 올려서 전체 상품 페이지를 다시 만듦
+EXPORT_FORMAT_VERSION = 1
+
+# 앱 HTML 안의 정적 파일 주소 (app/static/assets/해시.확장자, app/static/banners/해시.jpg)
+STATIC_URL_PATTERN = re.compile(r'app/static/(assets|banners)/([0-9a-f]{20}\.[a-z]+)')
+
+# 정적 페이지 전용 스타일 (Streamlit 화면 요소 대신 쓰는 링크 버튼, 페이지 이동)
+EXPORT_STYLE = """
+<style>
+    body {
+        margin: 0;
+        font-family: "Source Sans Pro", -apple-system, BlinkMacSystemFont, "Segoe UI", sans-serif;
+        color: #31333f;
+    }
+
+    .static-page {
+        max-width: 1200px;
+        margin: 0 auto;
+        padding: 24px 16px;
+    }
+
+    .button-link {
+        display: inline-block;
+        padding: 8px 16px;
+        border: 1px solid #d0d0d0;
+        border-radius: 8px;
+        color: #31333f;
+        text-decoration: none;
+        background-color: white;
+    }
+
+    .button-link:hover {
+        border-color: #ff4b4b;
+        color: #ff4b4b;
+    }
+
+    .center {
+        text-align: center;
+        margin: 16px 0;
+    }
+
+    .pagination {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        margin: 16px 0;
+    }
+
+    .gallery-item .button-link {
+        display: block;
+        text-align: center;
+    }
+</style>
+"""
+
+
+# 파일 쓰기 (임시 파일에 쓴 뒤 교체)
+def write_text(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = get_tmp_path(path)
+    tmp_path.write_text(text, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+# 앱 HTML의 정적 파일 주소를 내보낸 사이트의 assets/ 주소로 바꾸고 파일 복사
+# used_assets에 참조한 파일명을 모아서 나중에 쓰지 않는 파일을 정리
+def localize_assets(html, output_dir, prefix, used_assets):
+    def replace(match):
+        name = match.group(2)
+        target = output_dir / "assets" / name
+        if not target.exists():
+            store_blob(app.STATIC_DIR / match.group(1) / name, target)
+        used_assets.add(name)
+        return f"{prefix}assets/{name}"
+    return STATIC_URL_PATTERN.sub(replace, html)
+
+
+# 파일을 내용 해시 파일명으로 assets/에 복사하고 주소 반환
+def export_asset(path, output_dir, prefix, used_assets):
+    name = f"{app.get_content_digest(path)[:20]}{path.suffix.lower()}"
+    target = output_dir / "assets" / name
+    if not target.exists():
+        store_blob(path, target)
+    used_assets.add(name)
+    return f"{prefix}assets/{name}"
+
+
+# 파생 이미지(너비별, 형식별)를 프로세스 풀에서 미리 생성 - 생성한 수 반환
+# 처음 내보낼 때는 AVIF/WebP 인코딩이 대부분의 시간을 차지함
+def warm_derivatives(catalog, max_workers=None):
+    tasks = app.get_missing_derivative_tasks(catalog)
+    if not tasks:
+        return 0
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count() or 1, mp_context=get_process_context()) as executor:
+        list(executor.map(create_derivative, *zip(*tasks), chunksize=8))
+    return len(tasks)
+
+
+# HTML 문서 틀
+def render_document(title, body):
+    return f"""<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+{app.PAGE_STYLE}
+{EXPORT_STYLE}
+</head>
+<body>
+<main class="static-page">
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+# 목록 페이지 파일명 (1페이지는 index.html)
+def get_list_page_name(page):
+    return "index.html" if page == 1 else f"page-{page}.html"
+
+
+# 상품 목록 페이지 HTML
+def render_list_page(settings, product_table, folder_names, page, total_pages, app_url):
+    body = app.get_header_html(settings)
+    body += app.get_banner_html(
+        settings.get('banners', []),
+        settings.get('banner_slide_interval', 3),
+        get_src=lambda banner: f"{app.STATIC_URL_PREFIX}/banners/{banner}"
+    )
+    body += app.get_notice_html(settings)
+    body += "<h3>신상품</h3><hr>"
+    body += app.get_product_cards_html(folder_names, product_table, lambda folder_num: f"product/{folder_num}.html", wait=True)
+
+    if total_pages > 1:
+        prev_link = (
+            f'<a class="button-link" href="{get_list_page_name(page - 1)}">◀ 이전</a>' if page > 1 else "<span></span>"
+        )
+        next_link = (
+            f'<a class="button-link" href="{get_list_page_name(page + 1)}">다음 ▶</a>' if page < total_pages else "<span></span>"
+        )
+        body += f'<div class="pagination">{prev_link}<span>{page} / {total_pages} 페이지</span>{next_link}</div>'
+
+    body += app.get_footer_html(settings)
+    body += f'<div class="center"><a class="button-link" href="{app_url}?view=inquiry">📧 문의하기</a></div>'
+    return render_document(settings.get('shop_name', 'OUR Shop'), body)
+
+
+# 상품 상세 페이지 HTML
+def render_product_page(settings, product_table, product, back_page, output_dir, used_assets):
+    folder_num = product["id"]
+    # 시트 값은 본문과 download 속성에 그대로 들어가므로 이스케이프
+    product_name, product_info, product_price = (
+        html.escape(str(value), quote=True) for value in app.get_product_info(folder_num, product_table)
+    )
+
+    body = app.get_header_html(settings)
+    body += f'<a class="button-link" href="../{get_list_page_name(back_page)}">← 목록으로 돌아가기</a><hr>'
+    body += f'<h1>{product_name}</h1>'
+    body += f'<div style="font-size: 16px; margin: 10px 0;"><strong>색상/사이즈:</strong> {product_info}</div>'
+    body += f'<div style="font-size: 16px; margin: 10px 0;"><strong>가격:</strong> {product_price}</div><hr>'
+
+    if not product["images"]:
+        body += '<p>상품 이미지가 없습니다.</p>'
+        return render_document(product_name, body)
+
+    zip_url = export_asset(app.get_product_zip(product["path"]), output_dir, "../", used_assets)
+    body += (
+        f'<div class="center"><a class="button-link" href="{zip_url}" download="{product_name}_images.zip">'
+        f'📦 전체 이미지 다운로드 (ZIP)</a></div><hr>'
+    )
+
+    gallery = []
+    for img in product["images"]:
+        gallery.append(
+            f'<div class="gallery-item">{app.get_gallery_image_html(img["path"], img["name"], wait=True)}'
+            f'<a class="button-link" href="{app.get_static_url(img["path"])}" download="{html.escape(img["name"], quote=True)}">📥 다운로드</a></div>'
+        )
+    body += f'<div class="product-grid">{"".join(gallery)}</div>'
+    return render_document(product_name, localize_assets(body, output_dir, "../", used_assets))
+
+
+# 상품 페이지 지문 (이미지 구성, 시트 행, 페이지 공통 요소가 같으면 다시 만들지 않음)
+def get_product_fingerprint(product, product_table, back_page, chrome_key):
+    source = json.dumps([
+        EXPORT_FORMAT_VERSION,
+        chrome_key,
+        back_page,
+        app.get_product_info(product["id"], product_table),
+        [[img["name"], img["size"], img["mtime_ns"], img["digest"]] for img in product["images"]]
+    ], ensure_ascii=False)
+    return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+
+# 정적 사이트 내보내기 - 요약 정보 반환
+def export_site(output_dir, app_url, offline=False, log=print):
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / EXPORT_MANIFEST_NAME
+    manifest = {"products": {}, "pages": {}}
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+
+    # 시트는 가능하면 최신 데이터로, 실패하면 저장된 스냅샷 사용
+    if not offline:
+        try:
+            app.refresh_sheet_data()
+        except Exception as e:
+            log(f"구글 시트를 불러오지 못해 저장된 데이터를 사용합니다: {e}")
+
+    settings = app.load_settings()
+    app.load_google_sheet_data()
+    product_table = app.get_product_table()
+    catalog = app.get_catalog_manifest()["products"]
+    folder_names = [folder.name for folder in app.get_product_folders()]
+
+    warmed = warm_derivatives(catalog)
+    if warmed:
+        log(f"파생 이미지 {warmed}개 생성")
+
+    page_size = max(1, int(settings.get('products_per_page', 12)))
+    total_pages = max(1, (len(folder_names) + page_size - 1) // page_size)
+    chrome_key = hashlib.sha1(app.get_header_html(settings).encode('utf-8')).hexdigest()
+
+    # 상품 상세 페이지 (바뀐 상품만)
+    products = {}
+    rendered = 0
+    for idx, folder_num in enumerate(folder_names):
+        product = catalog[folder_num]
+        back_page = idx // page_size + 1
+        fingerprint = get_product_fingerprint(product, product_table, back_page, chrome_key)
+        page_path = output_dir / "product" / f"{folder_num}.html"
+        previous = manifest["products"].get(folder_num)
+        if previous and previous["fingerprint"] == fingerprint and page_path.exists():
+            products[folder_num] = previous
+            continue
+
+        used_assets = set()
+        write_text(page_path, render_product_page(settings, product_table, product, back_page, output_dir, used_assets))
+        products[folder_num] = {"fingerprint": fingerprint, "assets": sorted(used_assets)}
+        rendered += 1
+        log(f"상품 페이지 생성: product/{folder_num}.html")
+
+    # 목록 페이지 (설정, 배너, 공지가 바뀔 수 있으므로 매번 생성)
+    pages = {}
+    for page in range(1, total_pages + 1):
+        used_assets = set()
+        page_folders = tuple(folder_names[(page - 1) * page_size:page * page_size])
+        html = render_list_page(settings, product_table, page_folders, page, total_pages, app_url)
+        write_text(output_dir / get_list_page_name(page), localize_assets(html, output_dir, "", used_assets))
+        pages[get_list_page_name(page)] = {"assets": sorted(used_assets)}
+
+    # 없어진 상품/목록 페이지와 더 이상 참조하지 않는 파일 정리
+    removed = 0
+    for folder_num in set(manifest["products"]) - set(products):
+        (output_dir / "product" / f"{folder_num}.html").unlink(missing_ok=True)
+        removed += 1
+    for page_name in set(manifest["pages"]) - set(pages):
+        (output_dir / page_name).unlink(missing_ok=True)
+
+    used = set()
+    for entry in list(products.values()) + list(pages.values()):
+        used.update(entry["assets"])
+    asset_dir = output_dir / "assets"
+    if asset_dir.exists():
+        for asset_path in asset_dir.iterdir():
+            if asset_path.name not in used:
+                asset_path.unlink(missing_ok=True)
+
+    write_text(manifest_path, json.dumps({"products": products, "pages": pages}, ensure_ascii=False, indent=2))
+    return {
+        "products": len(products),
+        "rendered": rendered,
+        "removed": removed,
+        "pages": len(pages),
+        "assets": len(used),
+        "output": output_dir
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스토어 화면을 정적 HTML 사이트로 내보내기")
+    parser.add_argument("--output", type=Path, default=EXPORT_DIR, help="내보낼 폴더 (기본값: site)")
+    parser.add_argument(
+        "--app-url",
+        default=os.environ.get("STOREFRONT_APP_URL"),
+        required=not os.environ.get("STOREFRONT_APP_URL"),
+        help="문의하기 링크가 연결될 Streamlit 앱 주소 (기본값: STOREFRONT_APP_URL 환경 변수)"
+    )
+    parser.add_argument("--offline", action="store_true", help="구글 시트를 새로 받지 않고 저장된 데이터 사용")
+    args = parser.parse_args()
+
+    summary = export_site(args.output, args.app_url, args.offline)
+    print(
+        f"상품 페이지 {summary['products']}개 중 {summary['rendered']}개 생성, {summary['removed']}개 삭제, "
+        f"목록 페이지 {summary['pages']}개, 파일 {summary['assets']}개 → {summary['output']}/"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
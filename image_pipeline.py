@@ -0,0 +1,589 @@
+# 이미지 처리 파이프라인
+# - 업로드 이미지 정규화 (EXIF 회전, 색상 모드) 및 최적화된 JPEG 저장
+# - 그리드/상세 페이지용 축소 이미지(파생 이미지) 생성
+# - WebP/AVIF 파생 이미지 (지원하는 브라우저에 더 작은 형식 제공)
+# - 그리드 카드용 흐린 미리보기 이미지 (LQIP)
+# - 콘텐츠 주소 저장소(내용 해시 파일명)와 지각 해시(dHash) 기반 유사 이미지 검사
+# - 이미지 라이브러리 일괄 재압축 (SSIM 기준 품질 선택, EXIF/ICC 제거, 원본 백업)
+# 프로세스 풀의 작업 프로세스가 불러올 수 있도록 Streamlit과 분리된 모듈로 둠
+#
+# 명령줄 사용법:
+#   python image_pipeline.py optimize [--target-ssim 0.98] [--workers 4]
+#   python image_pipeline.py restore
+
+import argparse
+import base64
+import csv
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import stat
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageCms, ImageFilter, ImageOps, features
+
+# 원본 JPEG 저장 품질
+JPEG_QUALITY = 88
+
+# 파생 이미지 형식별 확장자와 MIME 타입 (작은 형식부터)
+IMAGE_FORMATS = {
+    "avif": (".avif", "image/avif"),
+    "webp": (".webp", "image/webp"),
+    "jpeg": (".jpg", "image/jpeg")
+}
+
+# 흐린 미리보기 이미지 너비 (카드 HTML에 data URI로 직접 넣을 수 있을 만큼 작게)
+PLACEHOLDER_WIDTH = 20
+PLACEHOLDER_QUALITY = 50
+
+# 상품 이미지가 아닌 파일 (상품 폴더 안의 안내 이미지)
+EXCLUDED_IMAGE_NAMES = {"ㅎ.jpg"}
+
+# 일괄 최적화 기본 경로
+IMAGE_DIR = Path("image")
+DATA_DIR = Path("data")
+BLOB_DIR = Path("static") / "assets"
+OPTIMIZE_BACKUP_DIR = DATA_DIR / "originals"
+OPTIMIZE_MANIFEST_FILE = DATA_DIR / "optimize_manifest.json"
+OPTIMIZE_REPORT_FILE = DATA_DIR / "optimize_report.csv"
+
+# 일괄 최적화 설정 (높은 품질부터 시도해서 목표 SSIM을 넘는 가장 낮은 품질 선택)
+OPTIMIZE_QUALITIES = (90, 85, 80, 75, 70, 65)
+OPTIMIZE_TARGET_SSIM = 0.98
+OPTIMIZE_MIN_SAVINGS = 0.03
+
+
+# 다른 프로세스/세션과 겹치지 않는 임시 파일 경로
+def get_tmp_path(path):
+    return path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+# 작업 프로세스 시작 방식 (스레드가 여럿인 Streamlit 서버 프로세스를 fork하지 않도록 forkserver/spawn 사용)
+def get_process_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+# 상품 이미지 파일인지 (폴더 안의 *.jpg 중 안내 이미지 제외)
+def is_product_image(path):
+    return path.suffix.lower() == ".jpg" and path.name not in EXCLUDED_IMAGE_NAMES
+
+
+# 상품 폴더들 안의 상품 이미지 목록
+def find_library_images(image_dir):
+    return sorted(path for path in Path(image_dir).glob("*/*.jpg") if is_product_image(path))
+
+
+# 파일 내용 SHA-256 해시
+def get_file_digest(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# EXIF 회전을 적용하고 RGB로 변환 (투명 배경은 흰색으로 채움)
+def normalize_image(img):
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        background.paste(img, mask=img.split()[-1])
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+# 최적화된 프로그레시브 JPEG로 저장 (임시 파일에 쓴 뒤 교체)
+def save_jpeg(img, path, quality=JPEG_QUALITY):
+    tmp_path = get_tmp_path(path)
+    img.save(tmp_path, "JPEG", quality=quality, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+
+# 이 Pillow 빌드에서 저장할 수 있는 파생 이미지 형식 (JPEG는 항상 포함)
+def get_supported_formats():
+    return [fmt for fmt in IMAGE_FORMATS if fmt == "jpeg" or features.check(fmt)]
+
+
+# 형식에 맞춰 저장 (임시 파일에 쓴 뒤 교체)
+def save_image(img, path, fmt, quality):
+    if fmt == "jpeg":
+        save_jpeg(img, path, quality)
+        return
+    tmp_path = get_tmp_path(path)
+    if fmt == "webp":
+        img.save(tmp_path, "WEBP", quality=quality, method=4)
+    else:
+        # AVIF 인코딩은 느려서 빠른 속도 설정 사용
+        img.save(tmp_path, "AVIF", quality=quality, speed=8)
+    os.replace(tmp_path, path)
+
+
+# 파생 이미지 캐시 경로 (원본 경로 + 수정 시각 + 파일 크기 + 너비 + 형식으로 키 생성)
+def get_derivative_path(image_path, cache_dir, width, fmt="jpeg"):
+    stat = image_path.stat()
+    key_source = f"{image_path.as_posix()}:{stat.st_mtime_ns}:{stat.st_size}:{width}"
+    if fmt != "jpeg":
+        key_source += f":{fmt}"
+    key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+    return cache_dir / f"{key}{IMAGE_FORMATS[fmt][0]}"
+
+
+# 지정한 너비/형식의 파생 이미지 가져오기 (캐시에 없을 때만 원본을 디코딩해서 생성)
+def create_derivative(image_path, cache_dir, width, quality, fmt="jpeg"):
+    cache_path = get_derivative_path(image_path, cache_dir, width, fmt)
+    if cache_path.exists():
+        return cache_path
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with Image.open(image_path) as img:
+        # JPEG는 축소 디코딩으로 원본 전체를 풀지 않음
+        img.draft('RGB', (width, width))
+        img = normalize_image(img)
+        img.thumbnail((width, width * 4), Image.LANCZOS)
+        save_image(img, cache_path, fmt, quality)
+    return cache_path
+
+
+# 백그라운드 작업 프로세스 우선순위 낮추기 (화면 요청 처리를 방해하지 않도록)
+def lower_process_priority():
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+# 흐린 미리보기 이미지 생성 (아주 작게 줄이고 흐리게 한 JPEG의 data URI)
+def create_placeholder(image_path, width=PLACEHOLDER_WIDTH):
+    with Image.open(image_path) as img:
+        img.draft('RGB', (width, width))
+        img = normalize_image(img)
+        img.thumbnail((width, width * 4), Image.LANCZOS)
+        img = img.filter(ImageFilter.GaussianBlur(1))
+        buffer = io.BytesIO()
+        img.save(buffer, "JPEG", quality=PLACEHOLDER_QUALITY, optimize=True)
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+# 저장소 파일을 읽기 전용으로 (하드 링크로 연결된 상품 이미지도 같은 파일이라 함께 읽기 전용)
+# 파일을 제자리에서 고쳐 쓰면 같은 내용의 다른 상품 이미지와 해시 파일명이 모두 바뀌므로
+# 상품 이미지는 항상 임시 파일에 쓴 뒤 os.replace로 교체함
+def make_read_only(path):
+    if os.name != "nt":
+        os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+
+# 콘텐츠 주소 저장소에 파일 등록 (같은 내용은 한 번만 저장, 가능하면 하드 링크)
+# dedupe=True면 원래 경로도 저장소 파일을 가리키도록 바꿔서 디스크 중복을 없앰
+# (저장소 경로, 원래 경로를 저장소 파일로 교체했는지 여부) 반환
+def store_blob(path, blob_path, dedupe=False):
+    if not blob_path.exists():
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = get_tmp_path(blob_path)
+        try:
+            os.link(path, tmp_path)
+        except OSError:
+            # 다른 파일 시스템이면 복사
+            shutil.copyfile(path, tmp_path)
+        make_read_only(tmp_path)
+        os.replace(tmp_path, blob_path)
+        return blob_path, False
+
+    if dedupe:
+        make_read_only(blob_path)
+    if dedupe and not os.path.samefile(path, blob_path):
+        tmp_path = get_tmp_path(path)
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            return blob_path, False
+        os.replace(tmp_path, path)
+        return blob_path, True
+    return blob_path, False
+
+
+# 내용이 바뀐 파일을 저장소에 다시 연결 (같은 내용의 다른 상품 이미지와 하드 링크 공유)
+def relink_blob(path, blob_dir, digest=None):
+    digest = digest or get_file_digest(path)
+    return store_blob(path, Path(blob_dir) / f"{digest[:20]}{path.suffix.lower()}", dedupe=True)
+
+
+# 지각 해시 (dHash, 64비트) - 크기/압축이 달라도 비슷한 이미지는 비슷한 값
+def compute_dhash(img):
+    img.draft('L', (64, 64))
+    gray = ImageOps.exif_transpose(img).convert('L').resize((9, 8), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+# 파일의 지각 해시
+def compute_file_dhash(path):
+    with Image.open(path) as img:
+        return compute_dhash(img)
+
+
+# 두 지각 해시의 차이 (다른 비트 수)
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+# 업로드 이미지 한 장 처리 (작업 프로세스에서 실행)
+# derivative_specs: [(캐시 디렉토리, 너비, 품질, 형식), ...]
+def ingest_image(data, dest_path, derivative_specs=()):
+    dest_path = Path(dest_path)
+    with Image.open(io.BytesIO(data)) as img:
+        img = normalize_image(img)
+        save_jpeg(img, dest_path)
+        width, height = img.size
+
+    for cache_dir, derivative_width, quality, fmt in derivative_specs:
+        create_derivative(dest_path, Path(cache_dir), derivative_width, quality, fmt)
+
+    return {"path": dest_path, "width": width, "height": height, "size": dest_path.stat().st_size}
+
+
+# 업로드 이미지 여러 장을 프로세스 풀에서 병렬 처리
+# items: [(이미지 바이트, 저장 경로), ...]
+# on_progress(완료 수, 전체 수, 저장 경로, 오류 또는 None)
+def ingest_images(items, derivative_specs=(), on_progress=None, max_workers=None):
+    results = []
+    errors = []
+    if not items:
+        return results, errors
+
+    max_workers = min(len(items), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_process_context()) as executor:
+        futures = {
+            executor.submit(ingest_image, data, dest_path, derivative_specs): dest_path
+            for data, dest_path in items
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            dest_path = futures[future]
+            try:
+                results.append(future.result())
+                error = None
+            except Exception as e:
+                error = e
+                errors.append((dest_path, e))
+            if on_progress:
+                on_progress(done, len(items), dest_path, error)
+
+    return results, errors
+
+
+# 두 이미지의 구조적 유사도 (SSIM, 1.0이면 동일)
+# 색 손실도 반영하도록 YCbCr 채널별로 계산해서 밝기 4 : Cb 1 : Cr 1 비율로 평균
+def compute_ssim(img_a, img_b):
+    channels_a = img_a.convert('YCbCr').split()
+    channels_b = img_b.convert('YCbCr').split()
+    y, cb, cr = (compute_channel_ssim(a, b) for a, b in zip(channels_a, channels_b))
+    return (4 * y + cb + cr) / 6
+
+
+# 한 채널의 SSIM (8x8 블록 단위)
+def compute_channel_ssim(channel_a, channel_b):
+    a = np.asarray(channel_a, dtype=np.float64)
+    b = np.asarray(channel_b, dtype=np.float64)
+    height = a.shape[0] // 8 * 8
+    width = a.shape[1] // 8 * 8
+    if height == 0 or width == 0:
+        return 1.0 if np.array_equal(a, b) else 0.0
+
+    blocks_a = a[:height, :width].reshape(height // 8, 8, width // 8, 8)
+    blocks_b = b[:height, :width].reshape(height // 8, 8, width // 8, 8)
+    mean_a = blocks_a.mean(axis=(1, 3))
+    mean_b = blocks_b.mean(axis=(1, 3))
+    var_a = blocks_a.var(axis=(1, 3))
+    var_b = blocks_b.var(axis=(1, 3))
+    cov = (blocks_a * blocks_b).mean(axis=(1, 3)) - mean_a * mean_b
+
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    ssim_map = ((2 * mean_a * mean_b + c1) * (2 * cov + c2)) / (
+        (mean_a ** 2 + mean_b ** 2 + c1) * (var_a + var_b + c2)
+    )
+    return float(ssim_map.mean())
+
+
+# ICC 프로파일이 있으면 sRGB로 변환 (프로파일을 제거해도 색이 바뀌지 않도록)
+def convert_to_srgb(img):
+    icc_profile = img.info.get('icc_profile')
+    if not icc_profile:
+        return img
+    try:
+        source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+        srgb_profile = ImageCms.createProfile('sRGB')
+        return ImageCms.profileToProfile(img, source_profile, srgb_profile, outputMode='RGB')
+    except Exception:
+        return img
+
+
+# 라이브러리 이미지 한 장 최적화 (작업 프로세스에서 실행)
+# previous_digest: 지난 실행 후 이 파일의 내용 해시 (같으면 지난번 결과 그대로라 백업을 유지)
+def optimize_image(path, backup_path, target_ssim=OPTIMIZE_TARGET_SSIM, previous_digest=None):
+    path = Path(path)
+    backup_path = Path(backup_path)
+    original_data = path.read_bytes()
+    original_digest = hashlib.sha256(original_data).hexdigest()
+    if original_digest != previous_digest:
+        # 새로 올라오거나 교체된 이미지 - 예전 백업은 다른 사진이므로 버림
+        backup_path.unlink(missing_ok=True)
+
+    with Image.open(io.BytesIO(original_data)) as img:
+        img = convert_to_srgb(img)
+        reference = normalize_image(img)
+
+    # 메타데이터 없이 품질별로 인코딩해서 목표 SSIM을 만족하는 가장 작은 결과 선택
+    best = None
+    for quality in OPTIMIZE_QUALITIES:
+        buffer = io.BytesIO()
+        reference.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+        with Image.open(io.BytesIO(buffer.getvalue())) as candidate:
+            ssim = compute_ssim(reference, candidate)
+        if ssim < target_ssim:
+            break
+        best = (buffer.getvalue(), quality, ssim)
+
+    result = {
+        "path": path.as_posix(),
+        "before": len(original_data),
+        "after": len(original_data),
+        "quality": None,
+        "ssim": None,
+        "status": "skipped",
+        "digest": original_digest
+    }
+    if best is None or len(best[0]) > len(original_data) * (1 - OPTIMIZE_MIN_SAVINGS):
+        return result
+
+    # 원본은 처음 최적화할 때 한 번만 백업 (이미 있으면 지난번에 백업한 같은 이미지의 원본)
+    if not backup_path.exists():
+        backup_path.parent.mkdir(parents=True, exist_ok=True)
+        backup_path.write_bytes(original_data)
+
+    tmp_path = get_tmp_path(path)
+    tmp_path.write_bytes(best[0])
+    os.replace(tmp_path, path)
+
+    result.update({
+        "after": len(best[0]),
+        "quality": best[1],
+        "ssim": round(best[2], 4),
+        "status": "optimized",
+        "digest": hashlib.sha256(best[0]).hexdigest()
+    })
+    return result
+
+
+# 최적화 매니페스트의 파일 상태 (크기, 수정 시각)
+def get_file_state(path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+# 최적화 매니페스트 읽기/쓰기
+# {상대 경로: {"size", "mtime_ns", "target_ssim", "digest": 처리 후 내용 해시, "optimized": 원본을 백업하고 바꿨는지}}
+def load_optimize_manifest(manifest_path):
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+    return json.loads(manifest_path.read_text(encoding='utf-8'))
+
+
+def save_optimize_manifest(manifest, manifest_path):
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = get_tmp_path(manifest_path)
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(tmp_path, manifest_path)
+
+
+# 최적화 보고서 읽기/쓰기 (파일별 마지막 결과를 누적) - {경로: 결과}
+OPTIMIZE_REPORT_FIELDS = ["path", "before", "after", "quality", "ssim", "status"]
+
+
+def load_optimize_report(report_path):
+    report_path = Path(report_path)
+    if not report_path.exists():
+        return {}
+    with open(report_path, 'r', encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["before"] = int(row["before"])
+        row["after"] = int(row["after"])
+    return {row["path"]: row for row in rows}
+
+
+def save_optimize_report(report, report_path):
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = get_tmp_path(report_path)
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=OPTIMIZE_REPORT_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(report[path] for path in sorted(report))
+    os.replace(tmp_path, report_path)
+
+
+# 이미지 라이브러리 일괄 최적화 (이미 처리한 파일은 매니페스트로 건너뜀)
+# 바뀐 파일은 blob_dir 저장소에 다시 연결해서 중복 이미지의 하드 링크를 유지
+# on_progress(완료 수, 전체 수, 결과)
+def optimize_library(image_dir=IMAGE_DIR, backup_dir=OPTIMIZE_BACKUP_DIR, manifest_path=OPTIMIZE_MANIFEST_FILE,
+                     report_path=OPTIMIZE_REPORT_FILE, target_ssim=OPTIMIZE_TARGET_SSIM,
+                     on_progress=None, max_workers=None, blob_dir=BLOB_DIR):
+    image_dir = Path(image_dir)
+    backup_dir = Path(backup_dir)
+    report_path = Path(report_path)
+    manifest = load_optimize_manifest(manifest_path)
+    report = load_optimize_report(report_path)
+
+    # 삭제된 이미지의 기록과 백업 정리
+    for relative_path in list(manifest):
+        if not (image_dir / relative_path).exists():
+            (backup_dir / relative_path).unlink(missing_ok=True)
+            del manifest[relative_path]
+    for path in list(report):
+        if not Path(path).exists():
+            del report[path]
+
+    library_images = find_library_images(image_dir)
+    pending = []
+    for path in library_images:
+        relative_path = path.relative_to(image_dir).as_posix()
+        entry = manifest.get(relative_path)
+        if entry and entry.get("target_ssim") == target_ssim and {k: entry.get(k) for k in ("size", "mtime_ns")} == get_file_state(path):
+            continue
+        pending.append((path, relative_path, entry.get("digest") if entry else None))
+
+    results = []
+    if pending:
+        max_workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=get_process_context()) as executor:
+            futures = {
+                executor.submit(optimize_image, path, backup_dir / relative_path, target_ssim, previous_digest): (path, relative_path)
+                for path, relative_path, previous_digest in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                path, relative_path = futures[future]
+                try:
+                    result = future.result()
+                    if result["status"] == "optimized" and blob_dir is not None:
+                        relink_blob(path, blob_dir, result["digest"])
+                    # 백업이 남아 있으면 지금 파일은 최적화 결과 (지난 실행 결과를 다시 처리한 경우 포함)
+                    manifest[relative_path] = dict(
+                        get_file_state(path),
+                        target_ssim=target_ssim,
+                        digest=result["digest"],
+                        optimized=(backup_dir / relative_path).exists()
+                    )
+                except Exception as e:
+                    result = {"path": path.as_posix(), "before": path.stat().st_size, "after": path.stat().st_size,
+                              "quality": None, "ssim": None, "status": f"error: {e}"}
+                results.append(result)
+                if on_progress:
+                    on_progress(done, len(pending), result)
+
+    save_optimize_manifest(manifest, manifest_path)
+
+    # 전후 크기 보고서 (파일별 마지막 결과를 누적, 변경 없는 파일은 이전 결과 유지)
+    results.sort(key=lambda result: result["path"])
+    for result in results:
+        previous = report.get(result["path"])
+        if previous and previous["status"] == "optimized" and result["status"] == "skipped" and previous["after"] == result["after"]:
+            # 지난번에 최적화한 파일을 다시 검사한 경우 원래 절약량 유지
+            continue
+        report[result["path"]] = result
+    if results:
+        save_optimize_report(report, report_path)
+
+    before = sum(result["before"] for result in results)
+    after = sum(result["after"] for result in results)
+    return {
+        "checked": len(results),
+        "skipped_unchanged": len(library_images) - len(pending),
+        "optimized": sum(1 for result in results if result["status"] == "optimized"),
+        "errors": sum(1 for result in results if result["status"].startswith("error")),
+        "before": before,
+        "after": after,
+        "total_before": sum(row["before"] for row in report.values()),
+        "total_after": sum(row["after"] for row in report.values()),
+        "report": report_path,
+        "results": results
+    }
+
+
+# 백업해 둔 원본으로 되돌리기 (복원한 파일 수 반환)
+# 최적화 후 교체되거나 삭제된 이미지는 되돌리지 않고 그 백업만 정리
+def restore_originals(image_dir=IMAGE_DIR, backup_dir=OPTIMIZE_BACKUP_DIR, manifest_path=OPTIMIZE_MANIFEST_FILE,
+                      blob_dir=BLOB_DIR, report_path=OPTIMIZE_REPORT_FILE):
+    image_dir = Path(image_dir)
+    backup_dir = Path(backup_dir)
+    manifest = load_optimize_manifest(manifest_path)
+    report = load_optimize_report(report_path)
+    restored = 0
+    for relative_path, entry in list(manifest.items()):
+        if not entry.get("optimized"):
+            continue
+        path = image_dir / relative_path
+        backup_path = backup_dir / relative_path
+        if backup_path.exists() and path.exists() and get_file_digest(path) == entry.get("digest"):
+            tmp_path = get_tmp_path(path)
+            shutil.copyfile(backup_path, tmp_path)
+            os.replace(tmp_path, path)
+            if blob_dir is not None:
+                relink_blob(path, blob_dir)
+            restored += 1
+        backup_path.unlink(missing_ok=True)
+        del manifest[relative_path]
+        report.pop(path.as_posix(), None)
+    save_optimize_manifest(manifest, manifest_path)
+    if Path(report_path).exists():
+        save_optimize_report(report, report_path)
+    return restored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 이미지 라이브러리 일괄 최적화")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    optimize_parser = subparsers.add_parser("optimize", help="이미지 재압축 및 메타데이터 제거")
+    optimize_parser.add_argument("--image-dir", type=Path, default=IMAGE_DIR)
+    optimize_parser.add_argument("--target-ssim", type=float, default=OPTIMIZE_TARGET_SSIM)
+    optimize_parser.add_argument("--workers", type=int, default=None)
+
+    restore_parser = subparsers.add_parser("restore", help="백업한 원본 이미지로 되돌리기")
+    restore_parser.add_argument("--image-dir", type=Path, default=IMAGE_DIR)
+
+    args = parser.parse_args()
+
+    if args.command == "optimize":
+        def on_progress(done, total, result):
+            print(f"[{done}/{total}] {result['path']}: {result['status']} ({result['before']:,} -> {result['after']:,} bytes)")
+
+        summary = optimize_library(args.image_dir, target_ssim=args.target_ssim, on_progress=on_progress,
+                                   max_workers=args.workers)
+        saved = summary["before"] - summary["after"]
+        print(f"검사 {summary['checked']}개, 최적화 {summary['optimized']}개, 변경 없음으로 건너뜀 {summary['skipped_unchanged']}개, 오류 {summary['errors']}개")
+        print(f"{summary['before']:,} -> {summary['after']:,} bytes ({saved:,} bytes 절약)")
+        print(f"보고서: {summary['report']}")
+    elif args.command == "restore":
+        restored = restore_originals(args.image_dir)
+        print(f"원본 {restored}개를 복원했습니다.")
+
+
+if __name__ == "__main__":
+    main()